@@ -0,0 +1,66 @@
+"""add booking event history
+
+Revision ID: 3e7b5d2a9c48
+Revises: 1c9f4a6e8b25
+Create Date: 2026-10-19 15:03:26.118934
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7b5d2a9c48'
+down_revision: Union[str, Sequence[str], None] = '1c9f4a6e8b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Range-partitioned by month: the partition key must be part of the primary key
+    op.execute("""
+        CREATE TABLE booking_event (
+            id BIGSERIAL NOT NULL,
+            booking_id INTEGER NOT NULL,
+            from_status VARCHAR,
+            to_status VARCHAR NOT NULL,
+            source VARCHAR NOT NULL,
+            actor_id INTEGER,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # Indexes on the parent are created on every partition, present and future
+    op.create_index('ix_booking_event_booking_id_created_at', 'booking_event', ['booking_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_booking_event_created_at'), 'booking_event', ['created_at'], unique=False)
+    op.execute("CREATE TABLE booking_event_default PARTITION OF booking_event DEFAULT")
+
+    # Current month plus three ahead; the daily create_booking_event_partitions task keeps going
+    today = datetime.utcnow().date()
+    for offset in range(4):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        op.execute(
+            f"CREATE TABLE booking_event_y{start.year}m{start.month:02d} PARTITION OF booking_event "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    # Seed history with each existing booking's creation so per-booking timelines start somewhere
+    op.execute("""
+        INSERT INTO booking_event (booking_id, from_status, to_status, source, actor_id, created_at)
+        SELECT id, NULL, 'pending', 'migration', user_id, created_at FROM booking
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE booking_event")
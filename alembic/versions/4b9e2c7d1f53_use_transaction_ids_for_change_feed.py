@@ -0,0 +1,68 @@
+"""use transaction ids for change feed
+
+Revision ID: 4b9e2c7d1f53
+Revises: c84f1d6a2e39
+Create Date: 2026-10-19 19:42:31.518064
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9e2c7d1f53'
+down_revision: Union[str, Sequence[str], None] = 'c84f1d6a2e39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('booking', 'vehicle', 'tombstone'):
+        op.add_column(table, sa.Column('change_xid', sa.BigInteger(), nullable=True))
+        # Existing rows sort before anything written from now on
+        op.execute(f'UPDATE {table} SET change_xid = 0')
+
+    # pg_current_xact_id() needs Postgres 13+
+    op.execute("""
+        CREATE FUNCTION set_change_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('booking', 'vehicle', 'tombstone'):
+        op.execute(
+            f'CREATE TRIGGER {table}_set_change_xid BEFORE INSERT OR UPDATE ON {table} '
+            'FOR EACH ROW EXECUTE FUNCTION set_change_xid()'
+        )
+
+    op.drop_index('ix_booking_updated_at_id', table_name='booking')
+    op.drop_index('ix_booking_user_id_updated_at_id', table_name='booking')
+    op.drop_index('ix_vehicle_updated_at_id', table_name='vehicle')
+    op.drop_index('ix_tombstone_entity_deleted_at_id', table_name='tombstone')
+    op.create_index('ix_booking_change_xid_id', 'booking', ['change_xid', 'id'], unique=False)
+    op.create_index('ix_booking_user_id_change_xid_id', 'booking', ['user_id', 'change_xid', 'id'], unique=False)
+    op.create_index('ix_vehicle_change_xid_id', 'vehicle', ['change_xid', 'id'], unique=False)
+    op.create_index('ix_tombstone_entity_change_xid_id', 'tombstone', ['entity', 'change_xid', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstone_entity_change_xid_id', table_name='tombstone')
+    op.drop_index('ix_vehicle_change_xid_id', table_name='vehicle')
+    op.drop_index('ix_booking_user_id_change_xid_id', table_name='booking')
+    op.drop_index('ix_booking_change_xid_id', table_name='booking')
+    op.create_index('ix_tombstone_entity_deleted_at_id', 'tombstone', ['entity', 'deleted_at', 'id'], unique=False)
+    op.create_index('ix_vehicle_updated_at_id', 'vehicle', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_booking_user_id_updated_at_id', 'booking', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_booking_updated_at_id', 'booking', ['updated_at', 'id'], unique=False)
+
+    for table in ('booking', 'vehicle', 'tombstone'):
+        op.execute(f'DROP TRIGGER {table}_set_change_xid ON {table}')
+        op.drop_column(table, 'change_xid')
+    op.execute('DROP FUNCTION set_change_xid()')
@@ -0,0 +1,59 @@
+"""add daily rollups
+
+Revision ID: 5c2d8e41a7f3
+Revises: 3b5e7806aac1
+Create Date: 2026-10-19 09:12:04.512331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e41a7f3'
+down_revision: Union[str, Sequence[str], None] = '3b5e7806aac1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=False),
+    sa.Column('location', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('bookings_created', sa.Integer(), nullable=False),
+    sa.Column('bookings_confirmed', sa.Integer(), nullable=False),
+    sa.Column('cancellations', sa.Integer(), nullable=False),
+    sa.Column('booked_days', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'vehicle_id')
+    )
+    op.create_index(op.f('ix_daily_rollup_day'), 'daily_rollup', ['day'], unique=False)
+    op.create_index(op.f('ix_daily_rollup_vehicle_id'), 'daily_rollup', ['vehicle_id'], unique=False)
+    op.create_index(op.f('ix_daily_rollup_location'), 'daily_rollup', ['location'], unique=False)
+    op.create_table('rollup_dirty_day',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rollup_dirty_day_day'), 'rollup_dirty_day', ['day'], unique=False)
+    # Rollup rebuilds and the payment-timeout sweep both range-scan on created_at
+    op.create_index('ix_booking_created_at', 'booking', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_booking_created_at', table_name='booking')
+    op.drop_index(op.f('ix_rollup_dirty_day_day'), table_name='rollup_dirty_day')
+    op.drop_table('rollup_dirty_day')
+    op.drop_index(op.f('ix_daily_rollup_location'), table_name='daily_rollup')
+    op.drop_index(op.f('ix_daily_rollup_vehicle_id'), table_name='daily_rollup')
+    op.drop_index(op.f('ix_daily_rollup_day'), table_name='daily_rollup')
+    op.drop_table('daily_rollup')
@@ -0,0 +1,34 @@
+"""add vehicle search indexes
+
+Revision ID: f2b87d04c6e1
+Revises: e5a28c71b9d3
+Create Date: 2026-10-19 13:40:18.220571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b87d04c6e1'
+down_revision: Union[str, Sequence[str], None] = 'e5a28c71b9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as search_service.search_document()
+SEARCH_DOCUMENT = "lower(make || ' ' || model || ' ' || CAST(year AS TEXT) || ' ' || location)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX ix_vehicle_search_tsv ON vehicle USING gin (to_tsvector('simple', {SEARCH_DOCUMENT}))")
+    op.execute(f"CREATE INDEX ix_vehicle_search_trgm ON vehicle USING gin ({SEARCH_DOCUMENT} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_vehicle_search_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_vehicle_search_tsv")
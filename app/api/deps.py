@@ -4,9 +4,10 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlmodel import Session
-from app.core import security
+from app.core import revocation, security
 from app.core.config import settings
-from app.db.session import get_session
+from app.db import instrumentation
+from app.db.session import get_session, get_read_session, note_user
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
@@ -49,12 +50,20 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    if revocation.is_revoked(token_data.jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     user = session.get(User, int(token_data.sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Writes this request commits pin the user's reads to the primary
+    note_user(user.id)
     return user
 
 def get_current_active_superuser(
@@ -77,3 +86,14 @@ def get_refresh_token_from_cookie(request: Request) -> str:
             detail="Refresh token not found",
         )
     return refresh_token
+
+def query_budget(max_queries: int):
+    """
+    Route dependency declaring how many SQL statements the route may run,
+    e.g. dependencies=[Depends(deps.query_budget(5))].
+    """
+    def set_budget() -> None:
+        recorder = instrumentation.current_recorder()
+        if recorder is not None:
+            recorder.budget = max_queries
+    return set_budget
@@ -10,3 +10,7 @@ from app.api.v1.endpoints import bookings
 api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
 from app.api.v1.endpoints import payments
 api_router.include_router(payments.router, prefix="/payments", tags=["payments"])
+from app.api.v1.endpoints import admin
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+from app.api.v1.endpoints import quotes
+api_router.include_router(quotes.router, prefix="/quotes", tags=["quotes"])
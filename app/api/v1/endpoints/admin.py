@@ -0,0 +1,268 @@
+from typing import Any, List, Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+from app.api import deps
+from app.core import profiling
+from app.core.config import settings
+from app.helpers import metrics
+from app.helpers.catalog_cache import bump_version
+from app.models.user import User
+from app.models.rollup import DailyRollup
+from app.models.location import Location, LocationAlias
+from app.models.archive import BookingArchive
+from app.schemas.booking import BookingRead
+from app.helpers.responses import columns_for, rows_to_dicts, trusted_json
+from app.schemas.rollup import DailyRollupRead, RollupSummary
+from app.schemas.analytics import FleetUtilization
+from app.schemas.location import LocationAliasCreate, LocationRead
+from app.schemas.user import KYCQueueStats, KYCReviewItem
+from app.services import analytics_service, kyc_service, location_service, rollup_service
+
+router = APIRouter()
+
+@router.get("/rollups/daily", response_model=List[DailyRollupRead])
+def read_daily_rollups(
+    start_date: date,
+    end_date: date,
+    location: Optional[str] = None,
+    vehicle_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 500,
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Per vehicle, per day booking aggregates.
+    Every figure, including booked_days and revenue, is attributed to the
+    day the booking was created, not to the days the car is rented. For
+    occupancy over rental days use /admin/analytics/utilization.
+    """
+    statement = select(DailyRollup).where(
+        DailyRollup.day >= start_date,
+        DailyRollup.day <= end_date,
+    )
+    if location:
+        statement = statement.where(DailyRollup.location == location)
+    if vehicle_id:
+        statement = statement.where(DailyRollup.vehicle_id == vehicle_id)
+    statement = statement.order_by(DailyRollup.day, DailyRollup.vehicle_id).offset(skip).limit(limit)
+    return session.exec(statement).all()
+
+@router.get("/rollups/summary", response_model=List[RollupSummary])
+def read_rollup_summary(
+    start_date: date,
+    end_date: date,
+    group_by: str = "location",
+    location: Optional[str] = None,
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Revenue, utilization and PENDING -> CONFIRMED conversion grouped by location, vehicle or day.
+    Revenue and booked days are counted on the booking's creation day (when
+    it was sold), not spread over its rental days.
+    """
+    if group_by not in ("location", "vehicle", "day"):
+        raise HTTPException(status_code=400, detail="group_by must be one of: location, vehicle, day")
+    return rollup_service.summarize(session, start_date, end_date, group_by=group_by, location=location)
+
+@router.post("/rollups/rebuild")
+def rebuild_rollups(
+    start_date: date,
+    end_date: date,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Backfill rollups for a date range in the background.
+    """
+    from app.worker import rebuild_rollups as rebuild_rollups_task
+
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must be after start date")
+    task = rebuild_rollups_task.delay(start_date.isoformat(), end_date.isoformat())
+    return {"message": "Rollup rebuild scheduled", "task_id": task.id}
+
+@router.get("/analytics/utilization", response_model=FleetUtilization)
+def read_fleet_utilization(
+    start_date: date,
+    end_date: date,
+    location: Optional[str] = None,
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Per-vehicle and per-day occupancy, idle gaps and peak concurrent rentals.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must be after start date")
+    if (end_date - start_date).days > 3660:
+        raise HTTPException(status_code=400, detail="Window cannot exceed 10 years")
+    return analytics_service.fleet_utilization(session, start_date, end_date, location)
+
+@router.get("/bookings/archive", response_model=List[BookingRead])
+def read_archived_bookings(
+    user_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Archived (finished, past the archive horizon) bookings, newest first.
+    """
+    statement = select(*columns_for(BookingRead, BookingArchive))
+    if user_id:
+        statement = statement.where(BookingArchive.user_id == user_id)
+    if vehicle_id:
+        statement = statement.where(BookingArchive.vehicle_id == vehicle_id)
+    if start_date:
+        statement = statement.where(BookingArchive.end_date >= start_date)
+    if end_date:
+        statement = statement.where(BookingArchive.start_date <= end_date)
+    statement = statement.order_by(BookingArchive.created_at.desc()).offset(skip).limit(limit)
+    return trusted_json(rows_to_dicts(session.exec(statement).all()))
+
+@router.get("/locations", response_model=List[LocationRead])
+def read_locations(
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Canonical locations with their aliases.
+    """
+    aliases = {}
+    for alias, location_id in session.exec(select(LocationAlias.alias, LocationAlias.location_id)).all():
+        aliases.setdefault(location_id, []).append(alias)
+    return [
+        LocationRead(**location.dict(), aliases=sorted(aliases.get(location.id, [])))
+        for location in session.exec(select(Location).order_by(Location.name)).all()
+    ]
+
+@router.post("/locations/{location_id}/aliases", response_model=LocationRead)
+def create_location_alias(
+    location_id: int,
+    alias_in: LocationAliasCreate,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Add an alternative spelling (e.g. "Bombay") for a location.
+    """
+    location = session.get(Location, location_id)
+    if not location:
+        raise HTTPException(status_code=404, detail="Location not found")
+    alias = location_service.normalize(alias_in.alias)
+    if not alias:
+        raise HTTPException(status_code=400, detail="Alias must not be empty")
+    if session.exec(select(LocationAlias).where(LocationAlias.alias == alias)).first():
+        raise HTTPException(status_code=400, detail=f"Alias '{alias}' is already in use")
+    location_service.add_alias(session, location.id, alias_in.alias)
+    session.commit()
+    # GET /vehicles?location=<alias> now filters by location id instead of text
+    bump_version()
+    aliases = session.exec(select(LocationAlias.alias).where(LocationAlias.location_id == location.id)).all()
+    return LocationRead(**location.dict(), aliases=sorted(aliases))
+
+@router.post("/kyc/claim", response_model=List[KYCReviewItem])
+def claim_kyc_reviews(
+    limit: int = 10,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Lease the next submitted KYC documents, oldest first, for review.
+    Parallel reviewers never receive the same user; unfinished claims return
+    to the queue after KYC_CLAIM_LEASE_MINUTES.
+    """
+    if not 1 <= limit <= settings.KYC_CLAIM_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {settings.KYC_CLAIM_MAX_BATCH}")
+    users = kyc_service.claim(session, current_user.id, limit)
+    # Serialized before commit, which would otherwise expire every row
+    items = [KYCReviewItem.model_validate(user, from_attributes=True) for user in users]
+    session.commit()
+    return items
+
+@router.get("/kyc/queue", response_model=KYCQueueStats)
+def read_kyc_queue(
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: KYC review queue depth, claimed vs unclaimed, age of the oldest submission.
+    """
+    return kyc_service.queue_stats(session)
+
+@router.post("/profiles/token")
+def create_profiling_token(
+    expires_in_seconds: int = 3600,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Signed token; send it as the X-Profile-Token header to profile a request.
+    """
+    token, expires_at = profiling.create_profiling_token(min(expires_in_seconds, 86400))
+    return {"header": profiling.PROFILE_HEADER, "token": token, "expires_at": expires_at}
+
+@router.get("/profiles")
+def read_profiles(
+    limit: int = 50,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Most recent request profiles.
+    """
+    return profiling.list_reports(limit)
+
+@router.get("/profiles/{profile_id}")
+def read_profile(
+    profile_id: str,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Sampled stacks and SQL timings captured for one request.
+    """
+    report = profiling.get_report(profile_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return report
+
+@router.get("/metrics/sql")
+def read_sql_metrics(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Per-route SQL statement counts, DB time and budget / N+1 violations.
+    """
+    routes = {}
+    for name, values in metrics.snapshot("sql:").items():
+        requests = values.get("requests", 0) or 1
+        routes[name[len("sql:"):]] = {
+            **values,
+            "queries_per_request": round(values.get("queries", 0) / requests, 2),
+            "db_ms_per_request": round(values.get("db_ms", 0) / requests, 3),
+        }
+    return routes
+
+@router.get("/metrics/celery")
+def read_celery_metrics(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Queue depths plus per-task run time and queue lag.
+    """
+    from app.worker import queue_depths
+
+    tasks = {}
+    for name, values in metrics.snapshot("celery:").items():
+        runs = values.get("runs", 0) or 1
+        started = values.get("started", 0) or 1
+        tasks[name[len("celery:"):]] = {
+            **values,
+            "duration_ms_avg": round(values.get("duration_ms", 0) / runs, 3),
+            "queue_lag_ms_avg": round(values.get("queue_lag_ms", 0) / started, 3),
+        }
+    return {"queues": queue_depths(), "tasks": tasks}
@@ -1,10 +1,11 @@
 from datetime import timedelta
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
+from redis.exceptions import RedisError
 from sqlmodel import Session, select
 from app.api import deps
-from app.core import security
+from app.core import revocation, security
 from app.core.config import settings
 from app.db.session import get_session
 from app.models.user import User
@@ -14,6 +15,18 @@ from app.utils import validate_phone, validate_city
 
 router = APIRouter()
 
+def set_refresh_cookie(response: Response, refresh_token: str) -> None:
+    # Set refresh token as HttpOnly cookie
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        max_age=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+        expires=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+        samesite="lax",
+        secure=False
+    )
+
 @router.post("/login", response_model=Token)
 def login_access_token(
     response: Response,
@@ -41,16 +54,7 @@ def login_access_token(
         subject=user.id, expires_delta=refresh_token_expires
     )
     
-    # Set refresh token as HttpOnly cookie
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        max_age=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-        expires=settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
-        samesite="lax",
-        secure=False
-    )
+    set_refresh_cookie(response, refresh_token)
     
     return {
         "access_token": access_token,
@@ -65,7 +69,8 @@ def refresh_access_token(
     refresh_token: str = Depends(deps.get_refresh_token_from_cookie),
 ) -> Any:
     """
-    Refresh access token using refresh token from HttpOnly cookie
+    Refresh access token using refresh token from HttpOnly cookie.
+    The refresh token is rotated: each one can be exchanged exactly once.
     """
     try:
         from jose import jwt
@@ -85,12 +90,26 @@ def refresh_access_token(
     user = session.get(User, int(user_id))
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
+
+    # Revoking the presented token is also the claim: a replayed or concurrently
+    # reused refresh token finds it already revoked. Without Redis reuse cannot
+    # be detected, so refresh fails closed; access tokens keep working meanwhile.
+    try:
+        claimed = revocation.revoke(payload.get("jti"), payload["exp"])
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Token refresh is temporarily unavailable")
+    if not claimed:
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
     
     # Create new access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         subject=user.id, expires_delta=access_token_expires
     )
+    refresh_token_expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    set_refresh_cookie(response, security.create_refresh_token(
+        subject=user.id, expires_delta=refresh_token_expires
+    ))
     
     return {
         "access_token": access_token,
@@ -98,10 +117,20 @@ def refresh_access_token(
     }
 
 @router.post("/logout")
-def logout(response: Response):
-   
+def logout(
+    request: Request,
+    response: Response,
+    token: Optional[str] = Depends(deps.reusable_oauth2),
+):
+    """
+    Revoke the caller's access and refresh tokens and clear the cookies.
+    """
+    # Cookies go first: clearing them must not depend on Redis being reachable
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
+    access_token = token or request.cookies.get("access_token", "").removeprefix("Bearer ")
+    revocation.revoke_token(access_token)
+    revocation.revoke_token(request.cookies.get("refresh_token"))
     return {"message": "Logged out successfully"}
 
 @router.post("/signup", response_model=UserRead)
@@ -1,24 +1,27 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from app.api import deps
 from app.db.session import get_session
 from app.models.user import User
 from app.models.vehicle import Vehicle
 from app.models.booking import Booking, BookingStatus
-from app.schemas.booking import BookingCreate, BookingRead
-from app.services import booking_service
+from app.schemas.common import CompactPage
+from app.schemas.booking import BookingBatchCreate, BookingBatchRead, BookingChange, BookingChanges, BookingCreate, BookingEventRead, BookingRead
+from app.services import booking_service, change_feed, history_service
+from app.helpers.responses import columns_for, compact, project_columns, requested_fields, rows_to_dicts, trusted_json
 
 router = APIRouter()
 
-@router.post("/", response_model=BookingRead)
+@router.post("/", response_model=BookingRead, dependencies=[Depends(deps.query_budget(10))])
 def create_booking(
     *,
     session: Session = Depends(deps.get_session),
     booking_in: BookingCreate,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
-    vehicle = session.get(Vehicle, booking_in.vehicle_id)
+    # Row lock serializes concurrent bookings of the same vehicle until commit
+    vehicle = session.get(Vehicle, booking_in.vehicle_id, with_for_update=True)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
@@ -27,15 +30,11 @@ def create_booking(
 
     # Verify Location Match
     # "when user book car in fleet then use depend to check and verify that user location enter and vehicle base location are same"
-    vehicle_loc = vehicle.location.lower().strip()
-    pickup_loc = booking_in.pickup_location.lower().strip()
-    
-    # Check if vehicle location is part of pickup location (e.g. "Mumbai" in "Andheri, Mumbai")
-    # or exact match
-    if vehicle_loc not in pickup_loc and pickup_loc not in vehicle_loc:
+    location_matches, pickup_location_id = booking_service.match_pickup_location(session, vehicle, booking_in.pickup_location)
+    if not location_matches:
          raise HTTPException(status_code=400, detail=f"Pickup location must be within {vehicle.location}. You selected: {booking_in.pickup_location}")
 
-    total = booking_service.calculate_total(vehicle.daily_rate, booking_in.start_date, booking_in.end_date)
+    total = booking_service.calculate_total(vehicle.daily_rate, booking_in.start_date, booking_in.end_date, vehicle.location)
     
     try:
         booking = Booking(
@@ -44,44 +43,108 @@ def create_booking(
             start_date=booking_in.start_date,
             end_date=booking_in.end_date,
             pickup_location=booking_in.pickup_location,
+            pickup_location_id=pickup_location_id,
             total_amount=total,
             status=BookingStatus.PENDING
         )
         session.add(booking)
-        session.commit()
-        session.refresh(booking)
-        print(f"Booking created: {booking}")
+        booking_service.record_created(session, booking)
         session.commit()
         session.refresh(booking)
         print(f"Booking created: {booking}")
         
         # Enrich for response
-        return _enrich_booking_with_driver_info(session, booking)
+        return trusted_json(_enrich_booking_with_driver_info(session, booking))
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise e
 
-@router.get("/", response_model=List[BookingRead])
+@router.post("/batch", response_model=BookingBatchRead, dependencies=[Depends(deps.query_budget(12))])
+def create_bookings_batch(
+    *,
+    session: Session = Depends(deps.get_session),
+    batch_in: BookingBatchCreate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Book several vehicles in one transaction (e.g. a corporate event).
+    """
+    all_or_nothing = batch_in.mode == "all_or_nothing"
+    results, bookings = booking_service.create_batch(session, current_user.id, batch_in.items, all_or_nothing)
+    failed = len(results) - len(bookings)
+
+    if all_or_nothing and failed:
+        session.rollback()
+        for result in results:
+            if result["status"] == "created":
+                result["status"], result["error"] = "failed", "Not booked: another item in the batch failed"
+                del result["booking"]
+        raise HTTPException(status_code=409, detail={"message": f"{failed} of {len(results)} bookings failed", "results": results})
+
+    # Serialize before commit: committing expires the instances and reading them
+    # afterwards would cost a refresh query per booking
+    for result in results:
+        if result["status"] == "created":
+            result["booking"] = result["booking"].dict(include=set(BookingRead.model_fields))
+    session.commit()
+    return trusted_json({"created": len(bookings), "failed": failed, "results": results})
+
+@router.get("/", response_model=Union[List[BookingRead], CompactPage], dependencies=[Depends(deps.query_budget(3))])
 def read_bookings(
     skip: int = 0,
     limit: int = 100,
-    session: Session = Depends(deps.get_session),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields, e.g. id,status,start_date"),
+    compact_rows: bool = Query(False, alias="compact", description="Return {fields, rows} with one list per booking"),
+    session: Session = Depends(deps.get_read_session),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
    
-    if current_user.is_superuser:
-        statement = select(Booking).offset(skip).limit(limit)
-    else:
-        statement = select(Booking).where(Booking.user_id == current_user.id).offset(skip).limit(limit)
-    
-    bookings = session.exec(statement).all()
-    
-    # Enrich all bookings
-    enriched_bookings = [_enrich_booking_with_driver_info(session, b) for b in bookings]
-    return enriched_bookings
+    names = requested_fields(BookingRead, fields)
+    # Masking the driver contact needs the status even when it was not requested
+    loaded = names + (["status"] if "driver_contact" in names and "status" not in names else [])
+    driver_columns = [getattr(Vehicle, name) for name in ("driver_name", "driver_contact") if name in names]
+
+    # One joined projection instead of a vehicle lookup per booking; the join
+    # is skipped entirely when no driver field was asked for
+    statement = select(*project_columns(Booking, loaded), *driver_columns)
+    if driver_columns:
+        # Explicit left side: with only driver fields requested nothing in the
+        # select list is on the booking side
+        statement = statement.outerjoin_from(Booking, Vehicle, Vehicle.id == Booking.vehicle_id)
+    if not current_user.is_superuser:
+        statement = statement.where(Booking.user_id == current_user.id)
+    statement = statement.offset(skip).limit(limit)
+
+    bookings = rows_to_dicts(session.exec(statement).all())
+    if "driver_contact" in names:
+        for booking in bookings:
+            # Only show contact if confirmed
+            if booking["status"] != BookingStatus.CONFIRMED:
+                booking["driver_contact"] = None
+    if loaded != names:
+        bookings = [{name: booking[name] for name in names} for booking in bookings]
+    return trusted_json(compact(bookings, names) if compact_rows else bookings)
+
+@router.get("/changes", response_model=BookingChanges, dependencies=[Depends(deps.query_budget(4))])
+def read_booking_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Bookings changed since the cursor (own bookings, or all for admins).
+    Start without `since`, then pass back next_cursor.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    try:
+        feed = change_feed.changes(session, Booking, columns_for(BookingChange, Booking), "booking", since, limit, owner_id)
+    except change_feed.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return trusted_json(feed)
 
-def _enrich_booking_with_driver_info(session: Session, booking: Booking) -> BookingRead:
+def _enrich_booking_with_driver_info(session: Session, booking: Booking) -> dict:
     vehicle = session.get(Vehicle, booking.vehicle_id)
     driver_name = None
     driver_contact = None
@@ -92,14 +155,29 @@ def _enrich_booking_with_driver_info(session: Session, booking: Booking) -> Book
         if booking.status == BookingStatus.CONFIRMED:
             driver_contact = vehicle.driver_contact
             
-    # Create a dict from the booking to satisfy the Pydantic model (since we are adding fields)
-    booking_dict = booking.dict()
+    # Trusted ORM data: project onto the BookingRead fields without validating it again
+    booking_dict = booking.dict(include=set(BookingRead.model_fields))
     booking_dict['driver_name'] = driver_name
     booking_dict['driver_contact'] = driver_contact
     
-    return BookingRead(**booking_dict)
+    return booking_dict
+
+@router.get("/{booking_id}/events", response_model=List[BookingEventRead])
+def read_booking_events(
+    booking_id: int,
+    session: Session = Depends(deps.get_read_session),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Status history of a booking, oldest first.
+    """
+    if not current_user.is_superuser:
+        booking = session.get(Booking, booking_id)
+        if not booking or booking.user_id != current_user.id:
+            raise HTTPException(status_code=404, detail="Booking not found")
+    return history_service.for_booking(session, booking_id)
 
-@router.patch("/{booking_id}/cancel", response_model=BookingRead)
+@router.patch("/{booking_id}/cancel", response_model=BookingRead, dependencies=[Depends(deps.query_budget(8))])
 def cancel_booking(
     *,
     session: Session = Depends(deps.get_session),
@@ -119,9 +197,7 @@ def cancel_booking(
     if booking.status not in [BookingStatus.PENDING, BookingStatus.CONFIRMED]:
         raise HTTPException(status_code=400, detail="Cannot cancel a completed or already cancelled booking")
 
-    booking.status = BookingStatus.CANCELLED
-    session.add(booking)
+    booking_service.transition_status(session, booking, BookingStatus.CANCELLED, actor_id=current_user.id)
     session.commit()
     session.refresh(booking)
-    session.refresh(booking)
-    return _enrich_booking_with_driver_info(session, booking)
+    return trusted_json(_enrich_booking_with_driver_info(session, booking))
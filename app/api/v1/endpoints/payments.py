@@ -6,7 +6,7 @@ from app.db.session import get_session
 from app.models.booking import Booking, BookingStatus
 from app.models.payment import Payment, PaymentStatus
 from app.schemas.payment import PaymentCreate, PaymentRead
-from app.services import payment_service
+from app.services import booking_service, outbox_service, payment_service
 
 router = APIRouter()
 
@@ -35,10 +35,15 @@ def process_payment(
         transaction_id=txn_id
     )
     session.add(payment)
+    outbox_service.record(
+        session,
+        f"payment.{payment.status.value}",
+        booking.id,
+        {"booking_id": booking.id, "user_id": booking.user_id, "amount": payment.amount, "transaction_id": txn_id},
+    )
     
     if success:
-        booking.status = BookingStatus.CONFIRMED
-        session.add(booking)
+        booking_service.transition_status(session, booking, BookingStatus.CONFIRMED, actor_id=current_user.id)
         
     session.commit()
     session.refresh(payment)
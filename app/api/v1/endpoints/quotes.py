@@ -0,0 +1,29 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select
+from app.api import deps
+from app.models.vehicle import Vehicle
+from app.schemas.quote import QuoteRequest, QuoteRead
+from app.services import pricing_service
+
+router = APIRouter()
+
+@router.post("/", response_model=List[QuoteRead])
+def create_quotes(
+    *,
+    session: Session = Depends(deps.get_read_session),
+    quote_in: QuoteRequest,
+) -> Any:
+    """
+    Public endpoint - price many vehicles for the same dates in one call.
+    Unknown vehicle ids are left out of the response.
+    """
+    vehicles = session.exec(
+        select(Vehicle).where(Vehicle.id.in_(set(quote_in.vehicle_ids))).order_by(Vehicle.id)
+    ).all()
+    totals = pricing_service.quote_many(vehicles, quote_in.start_date, quote_in.end_date)
+    days = (quote_in.end_date - quote_in.start_date).days
+    return [
+        QuoteRead(vehicle_id=v.id, daily_rate=v.daily_rate, days=days, total=float(t))
+        for v, t in zip(vehicles, totals)
+    ]
@@ -1,8 +1,13 @@
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 from app.api import deps
 from app.core import security
+from app.core.config import settings
+from app.helpers.multipart import MultipartFileStream
+from app.services import kyc_service, storage_service
 from app.db.session import get_session
 from app.models.user import User, KYCStatus
 from app.schemas.user import UserRead, UserUpdate, UserKYCSubmit, UserKYCUpdate
@@ -10,6 +15,9 @@ from app.utils import validate_phone, validate_city
 
 router = APIRouter()
 
+KYC_DOCUMENT_TYPES = {"application/pdf": ".pdf", "image/jpeg": ".jpg", "image/png": ".png"}
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
 @router.get("/", response_model=list[UserRead])
 def read_users(
     skip: int = 0,
@@ -75,12 +83,67 @@ def submit_kyc(
     Submit KYC document.
     """
     current_user.kyc_document_url = kyc_in.document_url
-    current_user.kyc_status = KYCStatus.SUBMITTED
+    kyc_service.submit(current_user)
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
     return current_user
 
+@router.post("/kyc/upload", response_model=UserRead)
+async def upload_kyc_document(
+    request: Request,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Submit KYC document as a multipart upload (file field "file").
+    The body is streamed to the object store and hashed on the way.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.KYC_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Document exceeds {settings.KYC_MAX_UPLOAD_BYTES} bytes")
+
+    store = storage_service.get_object_store()
+    # The declared type is checked from the part headers, before anything is stored
+    upload = MultipartFileStream(request, "file", KYC_DOCUMENT_TYPES, "Document must be a PDF, JPEG or PNG file")
+    try:
+        staged = await storage_service.stage_stream(store, upload, settings.KYC_MAX_UPLOAD_BYTES)
+    except storage_service.ObjectTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    extension = KYC_DOCUMENT_TYPES[upload.content_type]
+    # Content-addressed key: re-uploading the same file reuses the stored copy
+    key = f"kyc/{staged.sha256}{extension}"
+    store.commit(staged, key)
+    return await run_in_threadpool(_submit_uploaded_kyc, session, current_user, key)
+
+def _submit_uploaded_kyc(session: Session, user: User, key: str) -> User:
+    from app.worker import process_kyc_document
+
+    user.kyc_document_key = key
+    user.kyc_document_url = f"{settings.API_V1_STR}/users/{user.id}/kyc/document"
+    kyc_service.submit(user)
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    process_kyc_document.delay(user.id, key)
+    return user
+
+@router.get("/{user_id}/kyc/document")
+def read_kyc_document(
+    *,
+    session: Session = Depends(deps.get_session),
+    user_id: int,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Download an uploaded KYC document.
+    """
+    user = session.get(User, user_id)
+    if not user or not user.kyc_document_key:
+        raise HTTPException(status_code=404, detail="No uploaded KYC document")
+    return FileResponse(storage_service.get_object_store().path(user.kyc_document_key))
+
 @router.put("/{user_id}/kyc", response_model=UserRead)
 def update_kyc_status(
     *,
@@ -92,14 +155,18 @@ def update_kyc_status(
     """
     Admin: Approve or Reject KYC.
     """
-    user = session.get(User, user_id)
+    # Locked so the claim check below cannot race a concurrent claim
+    user = session.get(User, user_id, with_for_update=True)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     if user.kyc_status != KYCStatus.SUBMITTED:
         raise HTTPException(status_code=400, detail="KYC is not submitted")
+    if kyc_service.claimed_by_other(user, current_user.id):
+        raise HTTPException(status_code=409, detail="KYC is claimed by another reviewer")
     
     user.kyc_status = kyc_in.kyc_status
+    kyc_service.record_decision(user)
     # Update kyc_verified based on kyc_status
 
     
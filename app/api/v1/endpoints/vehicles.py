@@ -1,51 +1,211 @@
-from typing import Any, List, Optional
+import asyncio
+import orjson
+from typing import Any, List, Optional, Union
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select, and_, or_
 from app.api import deps
 from app.db.session import get_session
 from app.models.user import User
 from app.models.vehicle import Vehicle, VehicleStatus
 from app.models.booking import Booking, BookingStatus
-from app.schemas.vehicle import VehicleCreate, VehicleRead, VehicleUpdate
+from app.schemas.common import CompactPage
+from app.schemas.vehicle import VehicleChange, VehicleChanges, VehicleCreate, VehicleNearby, VehicleRead, VehicleSuggestion, VehicleUpdate
+from app.services import availability_service, booking_service, change_feed, geo_index, image_service, location_service, pricing_service, search_service, storage_service
+from app.core.config import settings
+from app.helpers.catalog_cache import catalog_cache, bump_version
+from app.helpers.multipart import MultipartFileStream
+from starlette.concurrency import run_in_threadpool
+from app.helpers.responses import columns_for, compact, project_columns, requested_fields, rows_to_dicts, trusted_json
 
-from app.utils import validate_phone, validate_city
+from app.utils import validate_phone, validate_city, geocode_city
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[VehicleRead])
+@router.get("/", response_model=Union[List[VehicleRead], CompactPage], dependencies=[Depends(deps.query_budget(2))])
 def read_vehicles(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     location: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    session: Session = Depends(deps.get_session),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields, e.g. id,make,model,daily_rate"),
+    compact_rows: bool = Query(False, alias="compact", description="Return {fields, rows} with one list per vehicle"),
+    session: Session = Depends(deps.get_read_session),
 ) -> Any:
     """
     Public endpoint - no auth required to browse vehicles
     """
-    query = select(Vehicle)
+    names = requested_fields(VehicleRead, fields)
+    quoting = bool(start_date and end_date) and "quoted_total" in names
+    if fields is not None and not quoting and not project_columns(Vehicle, names):
+        # Only quoted_total asked for, but there is nothing to quote without dates
+        raise HTTPException(status_code=400, detail="quoted_total requires start_date and end_date")
+    # Pages are cached serialized and precompressed until the catalog changes
+    return catalog_cache.respond(request, lambda: _vehicle_page(
+        session, names, quoting, skip, limit, location, start_date, end_date, fields is not None, compact_rows
+    ), depends_on_bookings=bool(start_date and end_date))
+
+def _vehicle_page(
+    session: Session,
+    names: List[str],
+    quoting: bool,
+    skip: int,
+    limit: int,
+    location: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    sparse: bool,
+    compact_rows: bool,
+) -> Any:
+    # Only the requested columns are selected; pricing additionally needs rate and location
+    loaded = names + [name for name in ("daily_rate", "location") if quoting and name not in names]
+    query = select(*project_columns(Vehicle, loaded))
 
     if location:
-        # Case-insensitive location filtering
-        query = query.where(Vehicle.location.ilike(f"%{location}%"))
+        location_id = location_service.resolve(session, location)
+        if location_id is not None:
+            query = query.where(Vehicle.location_id == location_id)
+        else:
+            # Not a known city: fall back to case-insensitive text matching
+            query = query.where(Vehicle.location.ilike(f"%{location}%"))
 
     if start_date and end_date:
         # Find busy vehicles
-        busy_subquery = select(Booking.vehicle_id).where(
-            Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-            and_(
-                Booking.start_date <= end_date,
-                Booking.end_date >= start_date
-            )
-        )
-        query = query.where(Vehicle.id.not_in(busy_subquery))
+        query = query.where(Vehicle.id.not_in(booking_service.busy_vehicle_ids(start_date, end_date)))
 
     query = query.offset(skip).limit(limit)
-    vehicles = session.exec(query).all()
-    return vehicles
+    rows = session.exec(query).all()
+
+    if compact_rows and not quoting:
+        return {"fields": [column.key for column in query.selected_columns], "rows": [list(row) for row in rows]}
+
+    vehicles = rows_to_dicts(rows)
+    if quoting:
+        # Annotate every result with its price for the searched dates
+        totals = pricing_service.quote_many(rows, start_date, end_date)
+        for vehicle, total in zip(vehicles, totals.tolist()):
+            vehicle["quoted_total"] = total
+    if sparse:
+        vehicles = [{name: vehicle.get(name) for name in names} for vehicle in vehicles]
+    return compact(vehicles, names) if compact_rows else vehicles
+
+@router.get("/nearby", response_model=List[VehicleNearby], dependencies=[Depends(deps.query_budget(2))])
+def read_nearby_vehicles(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25.0, gt=0, le=500),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=200),
+    session: Session = Depends(deps.get_read_session),
+) -> Any:
+    """
+    Available vehicles within radius_km of a point, nearest first
+    """
+    candidates = geo_index.ensure_fresh(session).nearby(lat, lon, radius_km)
+    if not candidates:
+        return trusted_json([])
+    distances = dict(candidates)
+
+    query = select(*columns_for(VehicleRead, Vehicle)).where(
+        Vehicle.id.in_(distances.keys()),
+        Vehicle.status == VehicleStatus.AVAILABLE,
+    )
+    if start_date and end_date:
+        query = query.where(Vehicle.id.not_in(booking_service.busy_vehicle_ids(start_date, end_date)))
+    rows = session.exec(query).all()
+
+    vehicles = rows_to_dicts(rows)
+    if start_date and end_date:
+        totals = pricing_service.quote_many(rows, start_date, end_date)
+        for vehicle, total in zip(vehicles, totals.tolist()):
+            vehicle["quoted_total"] = total
+    for vehicle in vehicles:
+        vehicle["distance_km"] = round(distances[vehicle["id"]], 3)
+    vehicles.sort(key=lambda v: v["distance_km"])
+    return trusted_json(vehicles[:limit])
+
+@router.get("/search", response_model=List[VehicleRead], dependencies=[Depends(deps.query_budget(1))])
+def search_vehicles(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(deps.get_read_session),
+) -> Any:
+    """
+    Free-text search over make, model, year and location, best matches first
+    """
+    columns = columns_for(VehicleRead, Vehicle)
+    rows = search_service.search(session, columns, q, skip, limit)
+    names = [column.key for column in columns]
+    return trusted_json([{name: row._mapping[name] for name in names} for row in rows])
+
+@router.get("/suggest", response_model=List[VehicleSuggestion])
+def suggest_vehicles(
+    prefix: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=25),
+    session: Session = Depends(deps.get_read_session),
+) -> Any:
+    """
+    Autocomplete for the search box, answered from memory
+    """
+    return trusted_json(search_service.ensure_suggestions(session).suggest(prefix, limit))
+
+@router.get("/changes", response_model=VehicleChanges, dependencies=[Depends(deps.query_budget(3))])
+def read_vehicle_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    session: Session = Depends(deps.get_read_session),
+) -> Any:
+    """
+    Vehicles changed or deleted since the cursor. Start without `since`, then
+    pass back next_cursor; repeat while has_more is true.
+    """
+    try:
+        return trusted_json(change_feed.changes(session, Vehicle, columns_for(VehicleChange, Vehicle), "vehicle", since, limit))
+    except change_feed.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/availability/stream")
+async def stream_availability(
+    request: Request,
+    location: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    session: Session = Depends(deps.get_read_session),
+) -> Any:
+    """
+    Server-sent events: availability deltas for a location/date window
+    whenever bookings are created, confirmed, cancelled or expired
+    """
+    location_id = await run_in_threadpool(location_service.resolve, session, location) if location else None
+    session.close()
+    subscription = availability_service.Subscription(location_id, start_date, end_date)
+    availability_service.broadcaster.subscribe(subscription)
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    change = await asyncio.wait_for(subscription.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: availability\ndata: {orjson.dumps(change).decode()}\n\n"
+        finally:
+            availability_service.broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/", response_model=VehicleRead)
 def create_vehicle(
@@ -65,15 +225,20 @@ def create_vehicle(
          raise HTTPException(status_code=400, detail=f"Location '{vehicle_in.location}' not found. Please enter a valid city.")
 
     vehicle = Vehicle.from_orm(vehicle_in)
+    vehicle.location_id = location_service.canonicalize_location(session, vehicle.location)
+    vehicle.latitude, vehicle.longitude = geocode_city(vehicle.location) or (None, None)
     session.add(vehicle)
     session.commit()
     session.refresh(vehicle)
+    geo_index.vehicle_index.upsert(vehicle.id, vehicle.latitude, vehicle.longitude)
+    search_service.suggestions.invalidate()
+    bump_version()
     return vehicle
 
 @router.get("/{vehicle_id}", response_model=VehicleRead)
 def read_vehicle_by_id(
     vehicle_id: int,
-    session: Session = Depends(deps.get_session),
+    session: Session = Depends(deps.get_read_session),
 ) -> Any:
   
     vehicle = session.get(Vehicle, vehicle_id)
@@ -95,12 +260,60 @@ def update_vehicle(
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
     vehicle_data = vehicle_in.dict(exclude_unset=True)
+    moved = "location" in vehicle_data and vehicle_data["location"] != vehicle.location
     for key, value in vehicle_data.items():
         setattr(vehicle, key, value)
+    if moved:
+        vehicle.location_id = location_service.canonicalize_location(session, vehicle.location)
+        vehicle.latitude, vehicle.longitude = geocode_city(vehicle.location) or (None, None)
         
     session.add(vehicle)
     session.commit()
     session.refresh(vehicle)
+    geo_index.vehicle_index.upsert(vehicle.id, vehicle.latitude, vehicle.longitude)
+    search_service.suggestions.invalidate()
+    bump_version()
+    return vehicle
+
+@router.post("/{vehicle_id}/image", response_model=VehicleRead, status_code=202)
+async def upload_vehicle_image(
+    request: Request,
+    vehicle_id: int,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admin: Upload a vehicle photo (multipart field "file"). The original is
+    stored right away; thumbnail/card/full variants are rendered in the
+    background and appear in image_variants when ready.
+    """
+    vehicle = await run_in_threadpool(session.get, Vehicle, vehicle_id)
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
+    store = storage_service.get_object_store()
+    upload = MultipartFileStream(request, "file", image_service.IMAGE_TYPES, "Image must be JPEG, PNG or WebP")
+    try:
+        staged = await storage_service.stage_stream(store, upload, settings.VEHICLE_IMAGE_MAX_UPLOAD_BYTES)
+    except storage_service.ObjectTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    extension = image_service.IMAGE_TYPES[upload.content_type]
+
+    original_key = f"vehicles/{staged.sha256}/original{extension}"
+    store.commit(staged, original_key)
+    return await run_in_threadpool(_attach_vehicle_image, session, vehicle, original_key, staged.sha256)
+
+def _attach_vehicle_image(session: Session, vehicle: Vehicle, original_key: str, sha256: str) -> Vehicle:
+    from app.worker import generate_vehicle_image_variants
+
+    vehicle.image_url = storage_service.get_object_store().url(original_key)
+    vehicle.image_variants = None
+    session.add(vehicle)
+    session.commit()
+    session.refresh(vehicle)
+    bump_version()
+    generate_vehicle_image_variants.delay(vehicle.id, original_key, sha256)
     return vehicle
 
 @router.delete("/{vehicle_id}", response_model=VehicleRead)
@@ -115,5 +328,9 @@ def delete_vehicle(
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     session.delete(vehicle)
+    change_feed.record_deletion(session, "vehicle", vehicle_id)
     session.commit()
+    geo_index.vehicle_index.remove(vehicle_id)
+    search_service.suggestions.invalidate()
+    bump_version()
     return vehicle
@@ -1,4 +1,5 @@
-from typing import List, Union
+import os
+from typing import Dict, List, Tuple, Union
 from pydantic import AnyHttpUrl, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,6 +9,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    # Revoked token ids are kept in Redis and mirrored into a Bloom filter per process
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 200000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_RELOAD_SECONDS: int = 300  # rebuild the filter to drop expired ids
+    TOKEN_REVOCATION_REDIS_BACKOFF_SECONDS: float = 5.0  # skip per-request Redis checks this long after a failure
     ALGORITHM: str = "HS256"
 
     POSTGRES_SERVER: str
@@ -15,12 +21,104 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated read replica URLs
+    READ_YOUR_WRITES_SECONDS: int = 5  # reads stay on the primary this long after a client's write
+    REPLICA_RETRY_SECONDS: int = 30  # how long a replica that failed to connect is skipped
+
+    # Process model (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # worker processes; 0 = one per CPU core
+    DB_MAX_CONNECTIONS: int = 100  # connections all API workers on this host may hold per database
+    SERVER_MAX_REQUESTS: int = 10000  # recycle a worker after this many requests
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_TIMEOUT: int = 60
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # drain window for in-flight requests on SIGTERM
+    SERVER_KEEPALIVE: int = 5
 
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    # Per-queue worker pools: state transitions get few slots with no prefetch so they
+    # start immediately; slow notification tasks get many slots and deeper prefetch.
+    CELERY_QUEUE_CONCURRENCY: Dict[str, int] = {"critical": 2, "default": 2, "notifications": 8, "media": 2}
+    CELERY_QUEUE_PREFETCH: Dict[str, int] = {"critical": 1, "default": 1, "notifications": 4, "media": 1}
+    REDIS_URL: str = "redis://localhost:6379/1"  # app keys; db 0 is for celery
+    # Request paths call Redis (revocation, idempotency, caches): an unreachable
+    # server must cost a bounded wait, not the OS TCP timeout
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 0.5
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    # Transactional outbox relayed to a Redis Stream read by consumer groups
+    OUTBOX_STREAM: str = "events:booking"
+    OUTBOX_STREAM_MAXLEN: int = 100000  # approximate cap on retained stream entries
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_RETENTION_DAYS: int = 7  # published outbox rows are purged after this
+    # A message whose handler failed this many deliveries is moved to the dead-letter stream
+    OUTBOX_MAX_DELIVERIES: int = 5
+    OUTBOX_DEAD_LETTER_STREAM: str = "events:booking:dead"
+    # Completed/cancelled bookings that ended this long ago move to booking_archive
+    BOOKING_ARCHIVE_AFTER_DAYS: int = 180
+    BOOKING_ARCHIVE_BATCH_SIZE: int = 1000
+    # Response compression (gzip, plus brotli when the brotli package is installed)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    # Serialized, precompressed GET /vehicles pages per API process
+    CATALOG_CACHE_MAX_ENTRIES: int = 512
+    CATALOG_CACHE_VERSION_TTL: float = 1.0  # seconds a worker may serve a page after invalidation
+    CATALOG_CACHE_UPGRADE_AFTER_HITS: int = 20  # hits before a page is recompressed at the highest level
+    # Change feeds only return changes at least this old, covering in-flight
+    # transactions and clock differences between API hosts
+    CHANGE_FEED_SAFETY_LAG_SECONDS: int = 5
+
+    # Object storage for uploads. Only "local" (filesystem) is implemented; keys under
+    # OBJECT_STORE_ROOT, public objects served from OBJECT_STORE_PUBLIC_URL.
+    OBJECT_STORE_BACKEND: str = "local"
+    OBJECT_STORE_ROOT: str = "./storage"
+    OBJECT_STORE_PUBLIC_URL: str = "/media"
+    KYC_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    # Uploaded KYC documents are scanned before review: "none" (accept all) or "clamd"
+    KYC_SCANNER_BACKEND: str = "none"
+    KYC_SCANNER_HOST: str = "localhost"
+    KYC_SCANNER_PORT: int = 3310
+    KYC_SCANNER_TIMEOUT: float = 30.0
+    VEHICLE_IMAGE_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    # KYC review queue: claimed submissions return to the queue after the lease ends
+    KYC_CLAIM_LEASE_MINUTES: int = 30
+    KYC_CLAIM_MAX_BATCH: int = 50
+
+    ENVIRONMENT: str = "production"  # set "dev" to expose X-DB-* debug headers; anything else records metrics
+
+    # Per-request SQL accounting. Routes may declare their own budget with deps.query_budget(n);
+    # strict mode turns an exceeded budget or an N+1 pattern into a 500 (meant for test runs).
+    SQL_STATS_ENABLED: bool = True
+    SQL_QUERY_BUDGET_DEFAULT: int = 30
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_STRICT_QUERY_BUDGET: bool = False
+
+    # On-demand profiling: requests carrying a valid X-Profile-Token header, plus
+    # a random PROFILING_SAMPLE_RATE fraction of all requests, are profiled.
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_TTL_SECONDS: int = 86400
+
+    # Pricing rules. Multipliers of 1.0 (the defaults) bill plain days * daily_rate.
+    PRICING_WEEKEND_MULTIPLIER: float = 1.0
+    PRICING_SEASONAL_MULTIPLIERS: Dict[int, float] = {}  # month (1-12) -> multiplier
+    PRICING_LOCATION_MULTIPLIERS: Dict[str, float] = {}  # lower-case location -> multiplier
+    PRICING_LONG_RENTAL_MULTIPLIERS: Dict[int, float] = {}  # minimum days -> multiplier, e.g. {"7": 0.9}
+    PRICING_TABLE_DAYS: int = 1096  # calendar span precompiled per location
 
     # BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = [] # Commenting out for now to isolate issues, can add back later
 
+    def worker_count(self) -> int:
+        return self.WEB_CONCURRENCY or os.cpu_count() or 1
+
+    def db_pool_limits(self) -> Tuple[int, int]:
+        # Split the connection budget evenly across workers: (pool_size, max_overflow)
+        per_worker = max(2, self.DB_MAX_CONNECTIONS // self.worker_count())
+        pool_size = max(1, per_worker * 2 // 3)
+        return pool_size, per_worker - pool_size
+
     model_config = SettingsConfigDict(
         case_sensitive=True,
         env_file=".env",
@@ -0,0 +1,194 @@
+import hashlib
+import hmac
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from app.core.config import settings
+from app.db import instrumentation
+from app.helpers.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_INDEX_KEY = "profiles:index"
+PROFILE_INDEX_SIZE = 200
+
+def create_profiling_token(expires_in_seconds: int = 3600) -> tuple[str, int]:
+    expires_at = int(time.time()) + expires_in_seconds
+    signature = hmac.new(settings.SECRET_KEY.encode(), f"profile:{expires_at}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{signature}", expires_at
+
+def verify_profiling_token(token: str) -> bool:
+    try:
+        expires_at, signature = token.split(".", 1)
+        if int(expires_at) < time.time():
+            return False
+    except ValueError:
+        return False
+    expected = hmac.new(settings.SECRET_KEY.encode(), f"profile:{expires_at}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+def should_profile(headers) -> Optional[str]:
+    """
+    Return the trigger ("header" or "sample") if this request should be profiled.
+    Kept to a header lookup and, only when sampling is configured, one random().
+    """
+    token = headers.get(PROFILE_HEADER)
+    if token is not None and verify_profiling_token(token):
+        return "header"
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sample"
+    return None
+
+class SamplingProfiler(threading.Thread):
+    """
+    Statistical profiler: periodically snapshots the stacks of the threads
+    serving the request (the event loop plus every threadpool worker that
+    executed SQL for it) and counts how often each frame shows up.
+    """
+
+    def __init__(self, thread_ids: Set[int], interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename}:{code.co_firstlineno}({code.co_name})")
+                    frame = frame.f_back
+                # An event loop parked in select() is idle, not slow
+                if "selectors.py" in stack[0]:
+                    continue
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def summary(self, limit: int = 40) -> dict:
+        own, cumulative = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                cumulative[frame] += count
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "top_self": [{"frame": f, "samples": c} for f, c in own.most_common(limit)],
+            "top_cumulative": [{"frame": f, "samples": c} for f, c in cumulative.most_common(limit)],
+        }
+
+def build_report(
+    method: str,
+    path: str,
+    status_code: int,
+    duration_ms: float,
+    trigger: str,
+    profiler: SamplingProfiler,
+    statements: List[tuple],
+    report_id: Optional[str] = None,
+) -> dict:
+    slowest = sorted(statements, key=lambda item: item[1], reverse=True)[:50]
+    return {
+        "id": report_id or uuid.uuid4().hex,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "method": method,
+        "path": path,
+        "status_code": status_code,
+        "duration_ms": round(duration_ms, 3),
+        "trigger": trigger,
+        "sql": {
+            "count": len(statements),
+            "total_ms": round(sum(d for _, d in statements), 3),
+            "slowest": [{"statement": s[:1000], "duration_ms": round(d, 3)} for s, d in slowest],
+        },
+        "profile": profiler.summary(),
+    }
+
+def store_report(report: dict) -> None:
+    summary = {k: report[k] for k in ("id", "created_at", "method", "path", "status_code", "duration_ms", "trigger")}
+    pipe = redis_client.pipeline()
+    pipe.setex(f"profiles:{report['id']}", settings.PROFILING_TTL_SECONDS, json.dumps(report))
+    pipe.lpush(PROFILE_INDEX_KEY, json.dumps(summary))
+    pipe.ltrim(PROFILE_INDEX_KEY, 0, PROFILE_INDEX_SIZE - 1)
+    pipe.execute()
+
+def list_reports(limit: int = 50) -> list:
+    return [json.loads(item) for item in redis_client.lrange(PROFILE_INDEX_KEY, 0, limit - 1)]
+
+def get_report(report_id: str) -> Optional[dict]:
+    data = redis_client.get(f"profiles:{report_id}")
+    return json.loads(data) if data else None
+
+class ProfilingMiddleware:
+    """
+    Profiles requests picked by `should_profile`. Plain ASGI, so requests
+    that are not profiled cost a header lookup and nothing else: no extra
+    task or response wrapping. The report id is sent with the response
+    headers and the report is stored once the body has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = should_profile(Headers(scope=scope))
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        report_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", report_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        recorder, token = instrumentation.start_recording()
+        recorder.thread_ids.add(threading.get_ident())
+        profiler = SamplingProfiler(recorder.thread_ids, settings.PROFILING_INTERVAL_MS / 1000)
+        profiler.start()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            profiler.stop()
+            instrumentation.stop_recording(token)
+            report = build_report(
+                scope["method"], scope["path"], status_code, duration_ms,
+                trigger, profiler, recorder.statements, report_id,
+            )
+            try:
+                await run_in_threadpool(store_report, report)
+            except Exception as e:
+                logger.warning(f"Could not store profile for {scope['path']}: {e}")
@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Iterable, List, Optional
+from jose import JWTError, jwt
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.security import ALGORITHM
+from app.helpers.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of revoked token ids scored by the token's expiry, so entries
+# can be pruned once the token would have been rejected anyway
+REVOKED_KEY = "auth:revoked"
+CHANNEL = "auth:revocations"
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over token ids. `in` never misses a member;
+    a hit is only a "maybe" that the caller confirms against Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item: str) -> None:
+        h1, h2 = self._hashes(item)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = self._hashes(item)
+        bits, size = self.bits, self.size
+        # Stops at the first clear bit, so most non-members cost one or two probes
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+def _build(jtis: Iterable[str], count: int) -> BloomFilter:
+    bloom = BloomFilter(
+        max(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, count * 2),
+        settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+    )
+    for jti in jtis:
+        bloom.add(jti)
+    return bloom
+
+class RevocationList:
+    """
+    Per-process mirror of the revoked token ids. A background thread loads
+    the Redis set, then applies revocations published by other processes;
+    the set is reloaded periodically to drop expired ids. Until the mirror
+    is loaded (or after the subscription drops) checks go to Redis directly,
+    except while Redis is known to be failing: then the last loaded filter
+    answers on its own instead of every request waiting on Redis.
+    """
+
+    def __init__(self):
+        self.bloom = BloomFilter(1, settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE)
+        self.ready = False  # filter loaded and subscription live
+        self.loaded = False  # filter loaded at least once, possibly stale
+        self._redis_down_until = 0.0
+        self._added_during_reload: Optional[List[str]] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._listen, name="token-revocations", daemon=True)
+                    self._thread.start()
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            self.bloom.add(jti)
+            if self._added_during_reload is not None:
+                self._added_during_reload.append(jti)
+
+    def reload(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._added_during_reload = []
+        try:
+            # Read without the lock so revocations on the request path never wait for Redis
+            pipe = redis_client.pipeline()
+            pipe.zremrangebyscore(REVOKED_KEY, "-inf", now)
+            pipe.zrangebyscore(REVOKED_KEY, now, "+inf")
+            _, members = pipe.execute()
+            bloom = _build((m.decode() for m in members), len(members))
+        except BaseException:
+            with self._lock:
+                self._added_during_reload = None
+            raise
+        with self._lock:
+            # Ids added while Redis was read may be missing from what it returned
+            for jti in self._added_during_reload:
+                bloom.add(jti)
+            self._added_during_reload = None
+            self.bloom = bloom
+            self.ready = self.loaded = True
+            self._redis_down_until = 0.0
+
+    def redis_failed(self, error: Exception) -> None:
+        now = time.monotonic()
+        if now >= self._redis_down_until:
+            logger.warning(
+                f"Token revocation checks fall back to the local filter for "
+                f"{settings.TOKEN_REVOCATION_REDIS_BACKOFF_SECONDS}s: {error}"
+            )
+        self._redis_down_until = now + settings.TOKEN_REVOCATION_REDIS_BACKOFF_SECONDS
+
+    def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before loading so nothing revoked in between is missed
+                pubsub.subscribe(CHANNEL)
+                self.reload()
+                reloaded_at = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.add(message["data"].decode())
+                    if time.monotonic() - reloaded_at >= settings.TOKEN_REVOCATION_RELOAD_SECONDS:
+                        self.reload()
+                        reloaded_at = time.monotonic()
+            except Exception as e:
+                self.ready = False
+                self.redis_failed(e)
+                time.sleep(1)
+            finally:
+                pubsub.close()
+
+    def _local_answer(self, jti: str) -> bool:
+        # Ids revoked before the filter was last loaded are still caught
+        return self.loaded and jti in self.bloom
+
+    def is_revoked(self, jti: str) -> bool:
+        self.ensure_started()
+        if self.ready and jti not in self.bloom:
+            return False
+        if time.monotonic() < self._redis_down_until:
+            return self._local_answer(jti)
+        try:
+            score = redis_client.zscore(REVOKED_KEY, jti)
+        except RedisError as e:
+            self.redis_failed(e)
+            return self._local_answer(jti)
+        return score is not None and score > time.time()
+
+revocation_list = RevocationList()
+
+def revoke(jti: Optional[str], expires_at: float) -> bool:
+    """
+    Revoke a token id until `expires_at` (unix time). Returns False if it
+    was already revoked, which makes this the claim step of refresh-token
+    rotation: of two concurrent refreshes with one token only one wins.
+    """
+    if not jti or expires_at <= time.time():
+        return True
+    pipe = redis_client.pipeline()
+    pipe.zadd(REVOKED_KEY, {jti: expires_at}, nx=True)
+    pipe.publish(CHANNEL, jti)
+    added, _ = pipe.execute()
+    revocation_list.add(jti)
+    return bool(added)
+
+def is_revoked(jti: Optional[str]) -> bool:
+    # Tokens issued before ids were added cannot be revoked; they expire on their own
+    return bool(jti) and revocation_list.is_revoked(jti)
+
+def revoke_token(token: Optional[str]) -> None:
+    """
+    Revoke an encoded token for the rest of its lifetime. Tokens that no
+    longer verify are ignored: they are rejected on use anyway. Best effort:
+    if Redis is down the token stays valid until it expires.
+    """
+    if not token:
+        return
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return
+    try:
+        revoke(payload.get("jti"), payload.get("exp", 0))
+    except RedisError as e:
+        logger.warning(f"Could not revoke token {payload.get('jti')}: {e}")
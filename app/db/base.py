@@ -3,3 +3,9 @@ from app.models.vehicle import Vehicle
 from app.models.booking import Booking
 from app.models.payment import Payment
 from sqlmodel import SQLModel
+from app.models.rollup import DailyRollup, RollupDirtyDay
+from app.models.location import Location, LocationAlias
+from app.models.outbox import OutboxEvent
+from app.models.booking_event import BookingEvent
+from app.models.archive import BookingArchive, PaymentArchive
+from app.models.tombstone import Tombstone
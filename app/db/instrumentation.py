@@ -0,0 +1,116 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+class QueryRecorder:
+    """
+    Collects the SQL executed on behalf of one request. Bound through a
+    context variable, which FastAPI copies into the threadpool that runs
+    sync dependencies and routes.
+    """
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+        self.thread_ids: Set[int] = set()
+        self.budget: Optional[int] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statement shapes executed at least `threshold` times: the signature
+        of an N+1 loop or of redundant refresh/commit round trips.
+        """
+        counts = Counter(fingerprint(statement) for statement, _ in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+    @property
+    def effective_budget(self) -> int:
+        # An explicit budget of 0 is a real budget, not "unset"
+        return self.budget if self.budget is not None else settings.SQL_QUERY_BUDGET_DEFAULT
+
+    def problems(self) -> List[str]:
+        found = []
+        if self.count > self.effective_budget:
+            found.append(f"{self.count} queries exceed the budget of {self.effective_budget}")
+        for shape, count in self.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            found.append(f"statement repeated {count}x (possible N+1): {shape[:200]}")
+        return found
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\([^)]+\)s|\$\d+|:\w+)\s*,?)+\)")
+_LITERAL = re.compile(r"\b\d+\b|'[^']*'")
+
+def fingerprint(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _LITERAL.sub("?", shape)
+
+_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar("query_recorder", default=None)
+
+def start_recording() -> Tuple[QueryRecorder, object]:
+    recorder = QueryRecorder()
+    return recorder, _recorder.set(recorder)
+
+def ensure_recording() -> Tuple[QueryRecorder, Optional[object]]:
+    # Reuse a recorder an outer middleware already bound for this request
+    recorder = _recorder.get()
+    if recorder is not None:
+        return recorder, None
+    return start_recording()
+
+def stop_recording(token) -> None:
+    _recorder.reset(token)
+
+def current_recorder() -> Optional[QueryRecorder]:
+    return _recorder.get()
+
+def register_current_thread() -> None:
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.thread_ids.add(threading.get_ident())
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _recorder.get() is not None and context is not None:
+        context._query_started_at = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    recorder = _recorder.get()
+    if recorder is None:
+        return
+    started_at = getattr(context, "_query_started_at", None)
+    duration_ms = (time.perf_counter() - started_at) * 1000 if started_at else 0.0
+    recorder.statements.append((statement, duration_ms))
+    recorder.thread_ids.add(threading.get_ident())
+
+@event.listens_for(Session, "before_commit")
+def _enforce_budget_before_commit(session):
+    # Strict mode refuses the commit, so a request that blew its budget
+    # leaves no state behind instead of failing after its writes landed
+    if not settings.SQL_STRICT_QUERY_BUDGET:
+        return
+    recorder = _recorder.get()
+    if recorder is not None:
+        problems = recorder.problems()
+        if problems:
+            raise QueryBudgetExceeded(problems)
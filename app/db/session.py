@@ -1,9 +1,176 @@
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from fastapi import Request
+from jose import JWTError, jwt
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as OrmSession
 from sqlmodel import create_engine, Session
 from app.core.config import settings
+from app.core.security import ALGORITHM
+from app.db import instrumentation
+from app.helpers.redis_client import redis_client
 
+logger = logging.getLogger(__name__)
 
-engine = create_engine(str(settings.DATABASE_URL), echo=True)
+
+def _engine_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        # Sync routes run in a threadpool; SQLite (used for local benchmarks) must allow that
+        return {"connect_args": {"check_same_thread": False}}
+    pool_size, max_overflow = settings.db_pool_limits()
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+engine = create_engine(str(settings.DATABASE_URL), echo=True, **_engine_kwargs(str(settings.DATABASE_URL)))
+
+replica_engines = [
+    create_engine(url.strip(), pool_pre_ping=True, **_engine_kwargs(url.strip()))
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+]
+
+def dispose_pools() -> None:
+    """
+    Drop pooled connections inherited from a parent process (preloaded
+    gunicorn master, Celery prefork) without closing the parent's sockets.
+    """
+    for e in [engine, *replica_engines]:
+        e.dispose(close=False)
+
+# Set after a committed write so the same client keeps reading from the primary
+# until replication has caught up. The cookie covers the browser that wrote;
+# the Redis key covers the same user on any other client or device.
+PRIMARY_PIN_COOKIE = "db_primary_until"
+PRIMARY_PIN_KEY = "db:primary_pin:{user_id}"
+
+# Per-request write tracking: pin_writers_to_primary binds a dict, commits
+# that wrote something mark it and get_current_user records the user.
+# Sync dependencies run with a copy of the context, so the dict is shared
+# rather than the variable reassigned.
+_request_writes: ContextVar[Optional[dict]] = ContextVar("request_writes", default=None)
+
+def track_writes() -> Tuple[dict, object]:
+    state = {"committed": False, "user_id": None}
+    return state, _request_writes.set(state)
+
+def stop_tracking_writes(token) -> None:
+    _request_writes.reset(token)
+
+def note_user(user_id: int) -> None:
+    state = _request_writes.get()
+    if state is not None:
+        state["user_id"] = user_id
+
+@event.listens_for(OrmSession, "after_flush")
+def _flushed_changes(session, flush_context):
+    # Still the pre-flush collections here
+    if session.new or session.dirty or session.deleted:
+        session.info["wrote"] = True
+
+@event.listens_for(OrmSession, "do_orm_execute")
+def _executed_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(OrmSession, "after_commit")
+def _committed(session):
+    if session.info.pop("wrote", False):
+        state = _request_writes.get()
+        if state is not None:
+            state["committed"] = True
+
+@event.listens_for(OrmSession, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+def pin_user_to_primary(user_id: int) -> None:
+    try:
+        redis_client.set(PRIMARY_PIN_KEY.format(user_id=user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Could not pin user {user_id} to the primary: {e}")
+
+class ReplicaRouter:
+    """
+    Round-robin over read replicas, skipping any that failed to connect
+    within the last REPLICA_RETRY_SECONDS.
+    """
+
+    def __init__(self, engines: List):
+        self.engines = engines
+        self._counter = itertools.count()
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List:
+        if not self.engines:
+            return []
+        start = next(self._counter) % len(self.engines)
+        ordered = self.engines[start:] + self.engines[:start]
+        now = time.monotonic()
+        return [e for e in ordered if self._down_until.get(id(e), 0) <= now]
+
+    def mark_down(self, replica) -> None:
+        with self._lock:
+            self._down_until[id(replica)] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+replica_router = ReplicaRouter(replica_engines)
+
+def _request_user_id(request: Request) -> Optional[int]:
+    token = request.headers.get("authorization") or request.cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token.removeprefix("Bearer "), settings.SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, ValueError):
+        return None
+
+def is_pinned_to_primary(request: Request) -> bool:
+    try:
+        if float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user_id = _request_user_id(request)
+    if user_id is None:
+        return False
+    try:
+        return bool(redis_client.exists(PRIMARY_PIN_KEY.format(user_id=user_id)))
+    except RedisError:
+        # Losing read-your-writes beats failing the read
+        return False
+
+def _open_replica_session() -> Optional[Session]:
+    for replica in replica_router.candidates():
+        session = Session(replica)
+        try:
+            # Check out a connection now so a dead replica fails over before the route runs
+            session.connection()
+            return session
+        except OperationalError:
+            session.close()
+            replica_router.mark_down(replica)
+    return None
 
 def get_session():
+    instrumentation.register_current_thread()
     with Session(engine) as session:
         yield session
+
+def get_read_session(request: Request):
+    """
+    Session for read-only routes: a healthy replica when configured, the
+    primary when none is reachable or the client or its user committed a
+    write recently.
+    """
+    instrumentation.register_current_thread()
+    session = None
+    if replica_engines and not is_pinned_to_primary(request):
+        session = _open_replica_session()
+    with session or Session(engine) as session:
+        yield session
@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+import orjson
+from fastapi import Request, Response
+from app.core.config import settings
+from app.helpers import compression
+from app.helpers.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "catalog:version"
+# Bumped by booking changes; only pages filtered by dates depend on it
+BOOKINGS_VERSION_KEY = "catalog:bookings_version"
+
+class _Entry:
+    __slots__ = ("bodies", "hits", "upgraded")
+
+    def __init__(self, body: bytes):
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        self.hits = 0
+        self.upgraded: Set[str] = set()
+
+    def body(self, encoding: str) -> bytes:
+        # A miss compresses at the normal level, as uncached responses would;
+        # entries that keep getting hit are recompressed once at the highest
+        # level, which pays off only when the body is reused many times
+        if encoding not in self.bodies:
+            self.bodies[encoding] = compression.compress(self.bodies["identity"], encoding)
+        elif encoding not in self.upgraded and self.hits >= settings.CATALOG_CACHE_UPGRADE_AFTER_HITS:
+            self.upgraded.add(encoding)
+            self.bodies[encoding] = compression.compress(self.bodies["identity"], encoding, best=True)
+        return self.bodies[encoding]
+
+class CatalogCache:
+    """
+    Per-process LRU of serialized catalog pages, keyed by URL and versions
+    kept in Redis. Bumping the catalog version (vehicle writes) invalidates
+    every worker's entries at once; bumping the bookings version only
+    invalidates date-filtered pages, so booking traffic does not empty the
+    cache of plain browse pages. Versions are re-read at most every
+    CATALOG_CACHE_VERSION_TTL seconds.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._versions: Optional[Tuple[bytes, bytes]] = None
+        self._versions_read_at = 0.0
+        self._lock = threading.Lock()
+
+    def versions(self) -> Tuple[bytes, bytes]:
+        if time.monotonic() - self._versions_read_at > settings.CATALOG_CACHE_VERSION_TTL:
+            catalog, bookings = redis_client.mget(VERSION_KEY, BOOKINGS_VERSION_KEY)
+            self._versions = (catalog or b"0", bookings or b"0")
+            self._versions_read_at = time.monotonic()
+        return self._versions
+
+    def respond(self, request: Request, build: Callable[[], object], depends_on_bookings: bool = False) -> Response:
+        """
+        Cached response for this URL, calling `build()` for the content on a miss.
+        Pages whose content depends on bookings (availability for dates) must say so.
+        """
+        try:
+            catalog, bookings = self.versions()
+            key = (catalog, bookings if depends_on_bookings else None, str(request.url))
+        except Exception:
+            # Redis down: serve uncached rather than stale
+            return Response(orjson.dumps(build()), media_type="application/json")
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        hit = entry is not None
+        if not hit:
+            entry = _Entry(orjson.dumps(build()))
+            with self._lock:
+                self.entries[key] = entry
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        else:
+            entry.hits += 1
+
+        encoding = None
+        if len(entry.bodies["identity"]) >= settings.COMPRESSION_MIN_SIZE:
+            encoding = compression.negotiate(request.headers.get("accept-encoding", ""))
+        headers = {"Vary": "Accept-Encoding", "X-Catalog-Cache": "hit" if hit else "miss"}
+        if encoding is None:
+            return Response(entry.body("identity"), media_type="application/json", headers=headers)
+        return Response(entry.body(encoding), media_type="application/json", headers={**headers, "Content-Encoding": encoding})
+
+def _bump(key: str, pipe=None) -> None:
+    if pipe is not None:
+        pipe.incr(key)
+        return
+    try:
+        redis_client.incr(key)
+    except Exception as e:
+        logger.warning(f"Could not invalidate the catalog cache: {e}")
+
+def bump_version(pipe=None) -> None:
+    """Invalidate every cached catalog page. Pass a pipeline to batch the INCR with other writes."""
+    _bump(VERSION_KEY, pipe)
+
+def bump_bookings_version(pipe=None) -> None:
+    """Invalidate cached pages that depend on bookings (date-filtered availability)."""
+    _bump(BOOKINGS_VERSION_KEY, pipe)
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_MAX_ENTRIES)
@@ -1,12 +1,7 @@
 from fastapi import Header, HTTPException
-import redis
-from app.core.config import settings
+from app.helpers.redis_client import redis_client
 import json
 
-
-
-redis_client = redis.Redis(host='localhost', port=6379, db=1) # using db 1 for keys, 0 is for celery
-
 def check_idempotency(idempotency_key: str = Header(None, alias="Idempotency-Key")):
     
     if not idempotency_key:
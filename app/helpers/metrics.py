@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+from app.helpers.redis_client import redis_client
+
+METRICS_PREFIX = "metrics"
+FLUSH_INTERVAL_SECONDS = 10.0
+
+_lock = threading.Lock()
+_pending: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+_last_flush = time.monotonic()
+
+def increment(name: str, **fields: float) -> None:
+    """
+    Add to counters of the `name` metric group. Values are buffered in
+    process and pushed to Redis by `flush`, so recording costs no I/O.
+    """
+    with _lock:
+        group = _pending[name]
+        for field, value in fields.items():
+            group[field] += value
+
+def flush_due() -> bool:
+    return time.monotonic() - _last_flush >= FLUSH_INTERVAL_SECONDS
+
+def flush() -> None:
+    global _pending, _last_flush
+    with _lock:
+        pending, _pending = _pending, defaultdict(lambda: defaultdict(float))
+        _last_flush = time.monotonic()
+    if not pending:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for name, group in pending.items():
+        pipe.sadd(f"{METRICS_PREFIX}:names", name)
+        for field, value in group.items():
+            pipe.hincrbyfloat(f"{METRICS_PREFIX}:{name}", field, value)
+    pipe.execute()
+
+def snapshot(prefix: str = "") -> Dict[str, Dict[str, float]]:
+    names = sorted(n.decode() for n in redis_client.smembers(f"{METRICS_PREFIX}:names"))
+    names = [n for n in names if n.startswith(prefix)]
+    pipe = redis_client.pipeline(transaction=False)
+    for name in names:
+        pipe.hgetall(f"{METRICS_PREFIX}:{name}")
+    return {
+        name: {k.decode(): float(v) for k, v in values.items()}
+        for name, values in zip(names, pipe.execute())
+    }
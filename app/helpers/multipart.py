@@ -0,0 +1,96 @@
+from typing import AsyncIterator, Collection, List, Optional
+from fastapi import HTTPException, Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+class MultipartFileStream:
+    """
+    Yields the bytes of one file field of a multipart/form-data request as
+    they arrive, instead of spooling the whole upload like UploadFile does.
+    `filename` and `content_type` are set once the part headers are parsed,
+    i.e. before the first chunk is yielded. With `content_types`, any other
+    declared type is a 415 raised before a single byte reaches the caller.
+    A body that ends before the file part is closed is a 400, raised after
+    the last chunk: nothing is complete until iteration finishes.
+    """
+
+    def __init__(self, request: Request, field_name: str, content_types: Optional[Collection[str]] = None, type_error: Optional[str] = None):
+        mime_type, params = parse_options_header(request.headers.get("content-type"))
+        if mime_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+        self.request = request
+        self.field_name = field_name.encode()
+        self.content_types = content_types
+        self.type_error = type_error or f"Unsupported content type; expected one of: {', '.join(content_types or [])}"
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.found = False
+
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_target = False
+        self._done = False
+        self._chunks: List[bytes] = []
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition"))
+        if disposition.get(b"name") == self.field_name and b"filename" in disposition and not self.found:
+            self.found = True
+            self._in_target = True
+            self.filename = disposition[b"filename"].decode("latin-1")
+            self.content_type = self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+
+    def _on_part_data(self, data, start, end):
+        if self._in_target:
+            self._chunks.append(bytes(data[start:end]))
+
+    def _on_part_end(self):
+        if self._in_target:
+            self._in_target = False
+            self._done = True
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for body_chunk in self.request.stream():
+            self._parser.write(body_chunk)
+            if self.found and self.content_types is not None and self.content_type not in self.content_types:
+                raise HTTPException(status_code=415, detail=self.type_error)
+            if self._chunks:
+                chunks, self._chunks = self._chunks, []
+                for chunk in chunks:
+                    yield chunk
+            if self._done:
+                return
+        self._parser.finalize()
+        if not self.found:
+            raise HTTPException(status_code=400, detail=f"Missing file field '{self.field_name.decode()}'")
+        if not self._done:
+            # The body ended before the part's closing boundary: a truncated upload
+            raise HTTPException(status_code=400, detail=f"Upload of '{self.field_name.decode()}' is incomplete")
@@ -0,0 +1,9 @@
+import redis
+from app.core.config import settings
+
+# Shared client for app-level keys (idempotency, profiles, metrics). Celery uses its own broker db.
+redis_client = redis.Redis.from_url(
+    settings.REDIS_URL,
+    socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
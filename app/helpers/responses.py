@@ -0,0 +1,49 @@
+from typing import Iterable, List, Optional, Type
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def columns_for(schema: Type[BaseModel], model) -> List:
+    """
+    Table columns backing a response schema, in schema field order. Fields the
+    table does not have (computed or joined values) are left to the caller.
+    """
+    return [getattr(model, name) for name in schema.model_fields if hasattr(model, name)]
+
+def requested_fields(schema: Type[BaseModel], fields: Optional[str]) -> List[str]:
+    """
+    Field names from a `fields=id,make,daily_rate` query parameter, in the
+    order given, or every schema field when it is absent. Unknown names are a 400.
+    """
+    if fields is None:
+        return list(schema.model_fields)
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown) or '(none given)'}. Available: {', '.join(schema.model_fields)}",
+        )
+    return names
+
+def project_columns(model, names: Iterable[str]) -> List:
+    """Table columns for the given field names; names the table lacks are skipped."""
+    return [getattr(model, name) for name in names if hasattr(model, name)]
+
+def compact(items: List[dict], names: List[str]) -> dict:
+    """
+    Column-oriented page: field names once, then one list per row. Much
+    smaller than repeating every key in every object for wide pages.
+    """
+    return {"fields": names, "rows": [[item.get(name) for name in names] for item in items]}
+
+def rows_to_dicts(rows: Iterable) -> List[dict]:
+    return [dict(row._mapping) for row in rows]
+
+def trusted_json(content) -> ORJSONResponse:
+    """
+    Serialize rows built from our own column projections straight to JSON.
+    Returning a Response makes FastAPI skip response_model validation, which
+    would otherwise re-validate every row of a list endpoint.
+    """
+    return ORJSONResponse(content=content)
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.core.config import settings
@@ -8,7 +9,13 @@ from app.core.exceptions import http_exception_handler, validation_exception_han
 from slowapi import _rate_limit_exceeded_handler, Limiter
 from slowapi.errors import RateLimitExceeded
 from app.core.limiter import limiter
-from app.db.session import engine
+from app.core import profiling
+from app.helpers import metrics
+from app.helpers.compression import CompressionMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.db import instrumentation
+from starlette.concurrency import run_in_threadpool
+from app.db.session import engine, replica_engines, PRIMARY_PIN_COOKIE, pin_user_to_primary, stop_tracking_writes, track_writes
 from sqlmodel import Session, select
 from app.models.user import User
 from app.core import security
@@ -24,6 +31,7 @@ def create_application() -> FastAPI:
         title=settings.PROJECT_NAME,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url=f"{settings.API_V1_STR}/docs",
+        default_response_class=ORJSONResponse,
     )
     # Global Exception Handlers
     application.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -38,6 +46,87 @@ def create_application() -> FastAPI:
         logger.info(f"Path: {request.url.path} Method: {request.method} Status: {response.status_code} Duration: {process_time:.4f}s")
         return response
 
+    if replica_engines:
+        @application.middleware("http")
+        async def pin_writers_to_primary(request: Request, call_next):
+            state, token = track_writes()
+            try:
+                response = await call_next(request)
+            finally:
+                stop_tracking_writes(token)
+            if state["committed"]:
+                # Read-your-writes: this client's and this user's reads skip
+                # replicas until they have caught up
+                response.set_cookie(
+                    key=PRIMARY_PIN_COOKIE,
+                    value=str(time.time() + settings.READ_YOUR_WRITES_SECONDS),
+                    max_age=settings.READ_YOUR_WRITES_SECONDS,
+                    httponly=True,
+                    samesite="lax",
+                )
+                if state["user_id"] is not None:
+                    await run_in_threadpool(pin_user_to_primary, state["user_id"])
+            return response
+
+    @application.middleware("http")
+    async def track_queries(request: Request, call_next):
+        if not settings.SQL_STATS_ENABLED:
+            return await call_next(request)
+
+        recorder, token = instrumentation.ensure_recording()
+        response = None
+        try:
+            response = await call_next(request)
+        except instrumentation.QueryBudgetExceeded:
+            # Raised by the strict-mode before_commit check; nothing was committed
+            pass
+        finally:
+            if token is not None:
+                instrumentation.stop_recording(token)
+
+        budget = recorder.effective_budget
+        repeated = recorder.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        route = request.scope.get("route")
+        # Unmatched paths share one bucket so arbitrary URLs cannot mint metric keys
+        route_name = f"{request.method} {route.path}" if route else "unmatched"
+
+        problems = recorder.problems()
+        for problem in problems:
+            logger.warning(f"SQL {route_name}: {problem}")
+
+        if settings.ENVIRONMENT == "dev":
+            if response is not None:
+                response.headers["X-DB-Query-Count"] = str(recorder.count)
+                response.headers["X-DB-Time-Ms"] = f"{recorder.total_ms:.2f}"
+                response.headers["X-DB-Repeated-Statements"] = str(len(repeated))
+        else:
+            metrics.increment(
+                f"sql:{route_name}",
+                requests=1,
+                queries=recorder.count,
+                db_ms=recorder.total_ms,
+                over_budget=int(recorder.count > budget),
+                n_plus_one=int(bool(repeated)),
+            )
+            if metrics.flush_due():
+                try:
+                    await run_in_threadpool(metrics.flush)
+                except Exception as e:
+                    logger.warning(f"Could not flush metrics: {e}")
+
+        if response is None or (problems and settings.SQL_STRICT_QUERY_BUDGET):
+            # Routes that commit are stopped before their commit; routes that
+            # don't have already run and only their response is replaced
+            return JSONResponse(
+                status_code=500,
+                content={"detail": f"SQL query budget violated for {route_name}", "problems": problems},
+            )
+        return response
+
+    application.add_middleware(profiling.ProfilingMiddleware)
+
+    # Wraps the request middlewares above, so they all see uncompressed bodies
+    application.add_middleware(CompressionMiddleware)
     application.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:5173"],  # Specific origin for credentials
@@ -50,6 +139,15 @@ def create_application() -> FastAPI:
     application.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
     application.include_router(api_router, prefix=settings.API_V1_STR)
+
+    # Public media (vehicle images) from the local object store. Only the vehicles/
+    # prefix is exposed; KYC documents go through the admin-only download route.
+    if settings.OBJECT_STORE_BACKEND == "local":
+        application.mount(
+            f"{settings.OBJECT_STORE_PUBLIC_URL}/vehicles",
+            StaticFiles(directory=f"{settings.OBJECT_STORE_ROOT}/vehicles", check_dir=False),
+            name="media",
+        )
     return application
 
 app = create_application()
@@ -0,0 +1,27 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from app.models.booking import BookingBase
+from app.models.payment import PaymentBase
+
+# Cold storage for finished bookings past BOOKING_ARCHIVE_AFTER_DAYS. Rows keep
+# their original ids; there are no foreign keys so vehicles and users can be
+# managed without touching history.
+
+class BookingArchive(BookingBase, table=True):
+    __tablename__ = "booking_archive"
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    user_id: int = Field(index=True)
+    vehicle_id: int = Field(index=True)
+    created_at: datetime = Field(index=True)
+    pickup_location_id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+    archived_at: datetime
+
+class PaymentArchive(PaymentBase, table=True):
+    __tablename__ = "payment_archive"
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    booking_id: int = Field(index=True)
+    archived_at: datetime
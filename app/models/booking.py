@@ -1,6 +1,7 @@
 from typing import Optional
 from datetime import datetime, date
-from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Index
+from sqlmodel import SQLModel, Field, Column
 from enum import Enum
 
 class BookingStatus(str, Enum):
@@ -19,5 +20,15 @@ class BookingBase(SQLModel):
     status: BookingStatus = Field(default=BookingStatus.PENDING)
 
 class Booking(BookingBase, table=True):
+    # Change feed keysets: all bookings (admin) and one user's bookings
+    __table_args__ = (
+        Index("ix_booking_change_xid_id", "change_xid", "id"),
+        Index("ix_booking_user_id_change_xid_id", "user_id", "change_xid", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    pickup_location_id: Optional[int] = Field(default=None, foreign_key="location.id", index=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    # Id of the last writing transaction, set by a Postgres trigger (see change_feed)
+    change_xid: Optional[int] = Field(default=None, sa_column=Column(BigInteger))
@@ -0,0 +1,33 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import BigInteger, FetchedValue, Index, Integer, event, func, select
+from sqlmodel import SQLModel, Field, Column
+
+class BookingEvent(SQLModel, table=True):
+    # Append-only status history. On Postgres the table is range-partitioned
+    # by month on created_at, so the partition key is part of the primary
+    # key; see the migration and history_service.ensure_partitions. No FK to
+    # booking so archived bookings keep their history.
+    __tablename__ = "booking_event"
+    __table_args__ = (Index("ix_booking_event_booking_id_created_at", "booking_id", "created_at"),)
+
+    id: Optional[int] = Field(
+        default=None,
+        # Generated by the BIGSERIAL default from the migration and read back with
+        # RETURNING. Not autoincrement: SQLite rejects that on a composite key.
+        sa_column=Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=False, server_default=FetchedValue()),
+    )
+    booking_id: int
+    from_status: Optional[str] = None
+    to_status: str
+    source: str  # "api" or "worker"
+    actor_id: Optional[int] = None  # user who caused the transition, if any
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True, index=True)
+
+@event.listens_for(BookingEvent, "before_insert")
+def _assign_sqlite_id(mapper, connection, target) -> None:
+    # SQLite (dev and benchmark databases) has no sequence behind id. The
+    # next id is computed inside the INSERT itself, which SQLite runs under
+    # its database write lock, so concurrent writers cannot pick the same one.
+    if target.id is None and connection.dialect.name == "sqlite":
+        target.id = select(func.coalesce(func.max(BookingEvent.id), 0) + 1).scalar_subquery()
@@ -0,0 +1,19 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+class Location(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+    # Normalized form of `name` ("navi mumbai"), the canonical lookup key
+    key: str = Field(unique=True, index=True)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+class LocationAlias(SQLModel, table=True):
+    # Alternative spellings that resolve to a location ("bombay" -> Mumbai).
+    # Every location also has an alias equal to its own key.
+    __tablename__ = "location_alias"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    alias: str = Field(unique=True, index=True)
+    location_id: int = Field(foreign_key="location.id", index=True)
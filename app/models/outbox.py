@@ -0,0 +1,19 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from sqlalchemy import Index, text
+from sqlmodel import SQLModel, Field, Column, JSON
+
+class OutboxEvent(SQLModel, table=True):
+    # Written in the same transaction as the state change it describes and
+    # relayed to the event stream afterwards, so no event is lost or invented.
+    __tablename__ = "outbox_event"
+    __table_args__ = (
+        Index("ix_outbox_event_unpublished", "id", postgresql_where=text("published_at IS NULL")),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_type: str
+    aggregate_id: int
+    payload: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    published_at: Optional[datetime] = Field(default=None, index=True)
@@ -0,0 +1,28 @@
+from typing import Optional
+from datetime import datetime, date
+from sqlmodel import SQLModel, Field, UniqueConstraint
+
+class DailyRollupBase(SQLModel):
+    day: date = Field(index=True)
+    vehicle_id: int = Field(index=True)
+    location: str = Field(index=True)
+    bookings_created: int = 0
+    bookings_confirmed: int = 0
+    cancellations: int = 0
+    booked_days: int = 0
+    revenue: float = 0.0
+
+class DailyRollup(DailyRollupBase, table=True):
+    __tablename__ = "daily_rollup"
+    __table_args__ = (UniqueConstraint("day", "vehicle_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
+
+class RollupDirtyDay(SQLModel, table=True):
+    # Days whose bookings changed since the last rollup refresh.
+    # Written in the same transaction as the booking change.
+    __tablename__ = "rollup_dirty_day"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date = Field(index=True)
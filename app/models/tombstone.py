@@ -0,0 +1,15 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import BigInteger, Index
+from sqlmodel import SQLModel, Field, Column
+
+class Tombstone(SQLModel, table=True):
+    # Deleted rows, so change feed clients can drop them locally
+    __table_args__ = (Index("ix_tombstone_entity_change_xid_id", "entity", "change_xid", "id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str  # "vehicle" or "booking"
+    entity_id: int
+    owner_id: Optional[int] = None  # user the row belonged to, for per-user feeds
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+    change_xid: Optional[int] = Field(default=None, sa_column=Column(BigInteger))
@@ -1,4 +1,6 @@
 from typing import Optional
+from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field
 from pydantic import EmailStr
 from enum import Enum
@@ -26,5 +28,16 @@ class UserBase(SQLModel):
     city: Optional[str] = None
 
 class User(UserBase, table=True):
+    # Review queue: only submitted users are indexed, in submission order
+    __table_args__ = (
+        Index("ix_user_kyc_queue", "kyc_submitted_at", "id", postgresql_where=text("kyc_status = 'SUBMITTED'")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: str
+    kyc_document_key: Optional[str] = None  # object store key of an uploaded document
+    kyc_submitted_at: Optional[datetime] = None
+    kyc_claimed_by: Optional[int] = Field(default=None, foreign_key="user.id")  # reviewer holding the lease
+    kyc_claimed_at: Optional[datetime] = None
+    kyc_decided_at: Optional[datetime] = Field(default=None, index=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow}, index=True)
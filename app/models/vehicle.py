@@ -1,5 +1,7 @@
-from typing import Optional
-from sqlmodel import SQLModel, Field
+from typing import Dict, Optional
+from datetime import datetime
+from sqlalchemy import BigInteger, Index
+from sqlmodel import SQLModel, Field, Column, JSON
 from enum import Enum
 
 class VehicleStatus(str, Enum):
@@ -20,4 +22,16 @@ class VehicleBase(SQLModel):
     image_url: Optional[str] = None
 
 class Vehicle(VehicleBase, table=True):
+    # (change_xid, id) is the keyset of the change feed
+    __table_args__ = (Index("ix_vehicle_change_xid_id", "change_xid", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    # {"thumbnail": {"webp": url, "jpeg": url}, "card": {...}, "full": {...}}
+    image_variants: Optional[Dict[str, Dict[str, str]]] = Field(default=None, sa_column=Column(JSON))
+    location_id: Optional[int] = Field(default=None, foreign_key="location.id", index=True)
+    # Geocoded from `location` when the vehicle is created or moved
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    # Id of the last writing transaction, set by a Postgres trigger (see change_feed)
+    change_xid: Optional[int] = Field(default=None, sa_column=Column(BigInteger))
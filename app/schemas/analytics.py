@@ -0,0 +1,27 @@
+from typing import List
+from datetime import date
+from pydantic import BaseModel
+
+class DailyUtilization(BaseModel):
+    day: date
+    active_rentals: int
+    occupancy_rate: float
+
+class VehicleUtilization(BaseModel):
+    vehicle_id: int
+    bookings: int
+    occupied_days: int
+    idle_days: int
+    occupancy_rate: float
+    longest_idle_gap: int
+
+class FleetUtilization(BaseModel):
+    start_date: date
+    end_date: date
+    fleet_size: int
+    bookings: int
+    peak_concurrent_rentals: int
+    peak_day: date
+    fleet_occupancy_rate: float
+    daily: List[DailyUtilization]
+    vehicles: List[VehicleUtilization]
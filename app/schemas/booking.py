@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import date, datetime
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from app.models.booking import BookingStatus
 
 class BookingCreate(BaseModel):
@@ -17,6 +17,12 @@ class BookingCreate(BaseModel):
             raise ValueError('End date must be after start date')
         return self
 
+class BookingBatchCreate(BaseModel):
+    items: List[BookingCreate] = Field(min_length=1, max_length=50)
+    # all_or_nothing: any failed item rejects the whole batch
+    # best_effort: valid items are booked, failed ones are reported
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+
 class BookingRead(BaseModel):
     id: int
     user_id: int
@@ -29,3 +35,32 @@ class BookingRead(BaseModel):
     driver_contact: Optional[str] = None
     status: BookingStatus
     created_at: datetime
+
+class BookingEventRead(BaseModel):
+    booking_id: int
+    from_status: Optional[str] = None
+    to_status: str
+    source: str
+    actor_id: Optional[int] = None
+    created_at: datetime
+
+class BookingChange(BookingRead):
+    updated_at: datetime
+
+class BookingChanges(BaseModel):
+    items: List[BookingChange]
+    deleted: List[int]
+    next_cursor: str
+    has_more: bool
+
+class BookingBatchItemResult(BaseModel):
+    index: int
+    vehicle_id: int
+    status: Literal["created", "failed"]
+    error: Optional[str] = None
+    booking: Optional[BookingRead] = None
+
+class BookingBatchRead(BaseModel):
+    created: int
+    failed: int
+    results: List[BookingBatchItemResult]
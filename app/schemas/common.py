@@ -0,0 +1,7 @@
+from typing import Any, List
+from pydantic import BaseModel
+
+class CompactPage(BaseModel):
+    # ?compact=true list pages: field names once, then one value list per row
+    fields: List[str]
+    rows: List[List[Any]]
@@ -0,0 +1,13 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class LocationRead(BaseModel):
+    id: int
+    name: str
+    key: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    aliases: List[str] = []
+
+class LocationAliasCreate(BaseModel):
+    alias: str
@@ -0,0 +1,20 @@
+from typing import List
+from datetime import date
+from pydantic import BaseModel, Field, model_validator
+
+class QuoteRequest(BaseModel):
+    vehicle_ids: List[int] = Field(min_length=1, max_length=500)
+    start_date: date
+    end_date: date
+
+    @model_validator(mode='after')
+    def check_dates(self) -> 'QuoteRequest':
+        if self.end_date <= self.start_date:
+            raise ValueError('End date must be after start date')
+        return self
+
+class QuoteRead(BaseModel):
+    vehicle_id: int
+    daily_rate: float
+    days: int
+    total: float
@@ -0,0 +1,23 @@
+from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel
+
+class DailyRollupRead(BaseModel):
+    day: date
+    vehicle_id: int
+    location: str
+    bookings_created: int
+    bookings_confirmed: int
+    cancellations: int
+    booked_days: int
+    revenue: float
+    refreshed_at: datetime
+
+class RollupSummary(BaseModel):
+    key: str
+    bookings_created: int
+    bookings_confirmed: int
+    cancellations: int
+    booked_days: int
+    revenue: float
+    conversion_rate: Optional[float] = None
@@ -35,6 +35,19 @@ class UserKYCSubmit(BaseModel):
 class UserKYCUpdate(BaseModel):
     kyc_status: KYCStatus
 
+class KYCReviewItem(UserRead):
+    kyc_submitted_at: Optional[datetime.datetime] = None
+    kyc_claimed_at: Optional[datetime.datetime] = None
+
+class KYCQueueStats(BaseModel):
+    depth: int
+    claimed: int
+    unclaimed: int
+    oldest_submitted_at: Optional[datetime.datetime] = None
+    oldest_age_seconds: Optional[float] = None
+    decisions_last_day: int
+    avg_wait_seconds_last_day: Optional[float] = None
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
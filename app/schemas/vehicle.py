@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import Dict, List, Optional
+from datetime import datetime
 from pydantic import BaseModel
 from app.models.vehicle import VehicleStatus
 
@@ -34,6 +35,28 @@ class VehicleRead(BaseModel):
     license_plate: str
     daily_rate: float
     location: str
+    location_id: Optional[int] = None
     driver_name: Optional[str] = None
     status: VehicleStatus
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    quoted_total: Optional[float] = None
+
+class VehicleNearby(VehicleRead):
+    distance_km: float
+
+class VehicleSuggestion(BaseModel):
+    text: str
+    kind: str
+    count: int
+
+class VehicleChange(VehicleRead):
+    updated_at: datetime
+
+class VehicleChanges(BaseModel):
+    items: List[VehicleChange]
+    deleted: List[int]
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,65 @@
+"""
+Production entry point: gunicorn master with uvicorn workers.
+
+    python -m app.server
+
+Sizing comes from Settings (WEB_CONCURRENCY, DB_MAX_CONNECTIONS, SERVER_*).
+The app is imported once in the master (preload) so workers share its
+memory; each worker drops the inherited DB pool right after fork.
+"""
+import logging
+from gunicorn.app.base import BaseApplication
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def post_fork(server, worker):
+    from app.db.session import dispose_pools
+    dispose_pools()
+
+def on_starting(server):
+    pool_size, max_overflow = settings.db_pool_limits()
+    logger.info(
+        f"Starting {settings.worker_count()} workers, DB pool per worker: "
+        f"{pool_size} + {max_overflow} overflow (budget {settings.DB_MAX_CONNECTIONS})"
+    )
+
+def worker_int(worker):
+    logger.info(f"Worker {worker.pid} interrupted, draining in-flight requests")
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+def gunicorn_options() -> dict:
+    return {
+        "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": settings.worker_count(),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVER_TIMEOUT,
+        # On SIGTERM the master stops accepting and gives workers this long to finish
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "post_fork": post_fork,
+        "on_starting": on_starting,
+        "worker_int": worker_int,
+        "accesslog": None,  # app.main already logs every request
+    }
+
+def main():
+    Server(gunicorn_options()).run()
+
+if __name__ == "__main__":
+    main()
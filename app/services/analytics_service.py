@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+from typing import Optional
+import numpy as np
+from sqlmodel import Session, select
+from app.models.booking import Booking, BookingStatus
+from app.models.vehicle import Vehicle
+from app.services import archive_service
+
+OCCUPYING_STATUSES = [BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
+
+def load_intervals(session: Session, start_date: date, end_date: date, location: Optional[str] = None):
+    """
+    Fetch the fleet and the booking intervals touching the window as plain
+    column tuples (no ORM instances) and pack them into NumPy arrays.
+    """
+    fleet_query = select(Vehicle.id)
+    if location:
+        fleet_query = fleet_query.where(Vehicle.location.ilike(f"%{location}%"))
+    fleet_ids = np.array(session.exec(fleet_query.order_by(Vehicle.id)).all(), dtype=np.int64)
+
+    # Windows older than the archive horizon need the archived bookings too
+    if start_date < archive_service.archive_cutoff():
+        bookings = archive_service.all_bookings().c
+    else:
+        bookings = Booking
+    booking_query = select(bookings.vehicle_id, bookings.start_date, bookings.end_date).where(
+        bookings.status.in_(OCCUPYING_STATUSES),
+        bookings.start_date <= end_date,
+        bookings.end_date > start_date,
+    )
+    if location:
+        booking_query = booking_query.where(bookings.vehicle_id.in_(fleet_query))
+    rows = session.exec(booking_query).all()
+
+    if rows:
+        vehicle_ids, starts, ends = zip(*rows)
+    else:
+        vehicle_ids, starts, ends = (), (), ()
+    return (
+        fleet_ids,
+        np.array(vehicle_ids, dtype=np.int64),
+        np.array(starts, dtype="datetime64[D]"),
+        np.array(ends, dtype="datetime64[D]"),
+    )
+
+def compute_utilization(
+    fleet_ids: np.ndarray,
+    vehicle_ids: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    start_date: date,
+    end_date: date,
+) -> dict:
+    """
+    Occupancy, idle gaps and peak concurrency over [start_date, end_date].
+
+    A booking occupies the nights [start_date, end_date), matching how
+    `calculate_total` bills it. Everything is computed with whole-array
+    operations; there is no per-booking Python loop.
+    """
+    n_days = (end_date - start_date).days + 1
+    n_vehicles = len(fleet_ids)
+    origin = np.datetime64(start_date, "D")
+
+    s = np.clip((starts - origin).astype(np.int64), 0, n_days)
+    e = np.clip((ends - origin).astype(np.int64), 0, n_days)
+    idx = np.searchsorted(fleet_ids, vehicle_ids)
+    keep = (e > s) & (idx < n_vehicles)
+    keep[keep] &= fleet_ids[idx[keep]] == vehicle_ids[keep]
+    s, e, idx = s[keep], e[keep], idx[keep]
+
+    # Per-day concurrent rentals via a difference array
+    delta = np.bincount(s, minlength=n_days + 1) - np.bincount(e, minlength=n_days + 1)
+    active = np.cumsum(delta)[:n_days]
+
+    # Per-vehicle coverage and idle gaps: sort by (vehicle, start) and carry
+    # the furthest end seen so far within each vehicle. Offsetting ends by
+    # vehicle index keeps a single global running max from leaking across
+    # vehicles.
+    order = np.lexsort((s, idx))
+    s, e, idx = s[order], e[order], idx[order]
+    offset = idx * (n_days + 1)
+    reach = np.maximum.accumulate(e + offset) - offset
+
+    first = np.ones(len(idx), dtype=bool)
+    first[1:] = idx[1:] != idx[:-1]
+    prev_reach = np.empty_like(reach)
+    prev_reach[1:] = reach[:-1]
+    prev_reach[first] = 0
+
+    covered = np.clip(e - np.maximum(s, prev_reach), 0, None)
+    gaps = np.clip(s - prev_reach, 0, None)
+
+    occupied_days = np.bincount(idx, weights=covered, minlength=n_vehicles).astype(np.int64)
+    booking_counts = np.bincount(idx, minlength=n_vehicles)
+    longest_gap = np.full(n_vehicles, n_days, dtype=np.int64)
+    if len(idx):
+        group_starts = np.flatnonzero(first)
+        group_ids = idx[group_starts]
+        group_ends = np.append(group_starts[1:], len(idx)) - 1
+        trailing = n_days - reach[group_ends]
+        longest_gap[group_ids] = np.maximum(np.maximum.reduceat(gaps, group_starts), trailing)
+
+    peak_index = int(active.argmax())
+    fleet_days = n_vehicles * n_days
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "fleet_size": n_vehicles,
+        "bookings": int(len(idx)),
+        "peak_concurrent_rentals": int(active[peak_index]),
+        "peak_day": start_date + timedelta(days=peak_index),
+        "fleet_occupancy_rate": float(occupied_days.sum() / fleet_days) if fleet_days else 0.0,
+        "daily": [
+            {
+                "day": start_date + timedelta(days=i),
+                "active_rentals": int(count),
+                "occupancy_rate": float(count / n_vehicles) if n_vehicles else 0.0,
+            }
+            for i, count in enumerate(active.tolist())
+        ],
+        "vehicles": [
+            {
+                "vehicle_id": int(fleet_ids[i]),
+                "bookings": int(booking_counts[i]),
+                "occupied_days": int(occupied_days[i]),
+                "idle_days": int(n_days - occupied_days[i]),
+                "occupancy_rate": float(occupied_days[i] / n_days),
+                "longest_idle_gap": int(longest_gap[i]),
+            }
+            for i in range(n_vehicles)
+        ],
+    }
+
+def fleet_utilization(session: Session, start_date: date, end_date: date, location: Optional[str] = None) -> dict:
+    arrays = load_intervals(session, start_date, end_date, location)
+    return compute_utilization(*arrays, start_date, end_date)
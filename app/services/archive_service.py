@@ -0,0 +1,68 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, insert, literal, union_all
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.archive import BookingArchive, PaymentArchive
+from app.models.booking import Booking, BookingStatus
+from app.models.payment import Payment
+from app.models.tombstone import Tombstone
+
+ARCHIVABLE_STATUSES = [BookingStatus.COMPLETED, BookingStatus.CANCELLED]
+
+def archive_cutoff(today: Optional[date] = None) -> date:
+    return (today or date.today()) - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS)
+
+def _copy(session: Session, source, target, where, archived_at: datetime) -> None:
+    # Columns only the hot table has (change feed positions) are not archived
+    names = [column.name for column in source.__table__.columns if column.name in target.__table__.columns]
+    session.execute(
+        insert(target.__table__).from_select(
+            names + ["archived_at"],
+            select(*(getattr(source, name) for name in names), literal(archived_at)).where(where),
+        )
+    )
+
+def archive_batch(session: Session, cutoff: date, batch_size: Optional[int] = None) -> int:
+    """
+    Move one batch of finished bookings that ended before `cutoff`, with their
+    payments, into the archive tables. Copy and delete share one transaction,
+    and rows are claimed with SKIP LOCKED so a booking being touched by a
+    request is simply left for the next run.
+    """
+    ids = session.exec(
+        select(Booking.id)
+        .where(Booking.status.in_(ARCHIVABLE_STATUSES), Booking.end_date < cutoff)
+        .order_by(Booking.id)
+        .limit(batch_size or settings.BOOKING_ARCHIVE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        session.rollback()
+        return 0
+
+    now = datetime.utcnow()
+    _copy(session, Booking, BookingArchive, Booking.id.in_(ids), now)
+    _copy(session, Payment, PaymentArchive, Payment.booking_id.in_(ids), now)
+    # Change feed clients drop archived bookings like deleted ones
+    session.execute(
+        insert(Tombstone.__table__).from_select(
+            ["entity", "entity_id", "owner_id", "deleted_at"],
+            select(literal("booking"), Booking.id, Booking.user_id, literal(now)).where(Booking.id.in_(ids)),
+        )
+    )
+    session.execute(delete(Payment).where(Payment.booking_id.in_(ids)))
+    session.execute(delete(Booking).where(Booking.id.in_(ids)))
+    session.commit()
+    return len(ids)
+
+def all_bookings():
+    """
+    Hot and archived bookings as one selectable for reporting queries that
+    span the archive horizon (rollup rebuilds, utilization).
+    """
+    columns = ["id", "user_id", "vehicle_id", "start_date", "end_date", "total_amount", "status", "created_at"]
+    return union_all(
+        select(*(getattr(Booking, name) for name in columns)),
+        select(*(getattr(BookingArchive, name) for name in columns)),
+    ).subquery("all_bookings")
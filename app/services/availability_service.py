@@ -0,0 +1,117 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional, Set
+from sqlalchemy import event
+from sqlmodel import Session
+from app.core.config import settings
+from app.helpers import catalog_cache
+from app.helpers.redis_client import redis_client
+from app.models.booking import Booking, BookingStatus
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "availability:changes"
+ACTIVE_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+_PENDING_KEY = "availability_changes"
+
+def queue_change(session: Session, booking: Booking, event_name: str) -> None:
+    """
+    Remember an availability delta for `booking`. It is published only once
+    the session commits, so subscribers never see a change that rolled back.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append({
+        "event": event_name,
+        "vehicle_id": booking.vehicle_id,
+        "location_id": booking.pickup_location_id,
+        "start_date": booking.start_date.isoformat(),
+        "end_date": booking.end_date.isoformat(),
+        "status": booking.status.value,
+        # The booking's dates became free (cancelled/expired/completed) or taken
+        "available": booking.status not in ACTIVE_STATUSES,
+    })
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for change in changes:
+            pipe.publish(CHANNEL, json.dumps(change))
+        # Only date-filtered catalog pages depend on bookings
+        catalog_cache.bump_bookings_version(pipe)
+        pipe.execute()
+    except Exception as e:
+        # Push is best effort; clients still converge on their next full fetch
+        logger.warning(f"Could not publish availability changes: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+@dataclass(eq=False)
+class Subscription:
+    location_id: Optional[int]
+    start_date: Optional[date]
+    end_date: Optional[date]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=100))
+
+    def wants(self, change: dict) -> bool:
+        # Changes without a resolved location are sent to everyone rather than dropped
+        if self.location_id is not None and change["location_id"] not in (None, self.location_id):
+            return False
+        if self.start_date and self.end_date:
+            return change["start_date"] <= self.end_date.isoformat() and change["end_date"] >= self.start_date.isoformat()
+        return True
+
+class Broadcaster:
+    """
+    One Redis subscription per process, fanned out to the in-memory queues
+    of the SSE clients connected to this worker.
+    """
+
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def dispatch(self, change: dict) -> None:
+        for subscription in list(self.subscriptions):
+            if not subscription.wants(change):
+                continue
+            if subscription.queue.full():
+                # Slow client: drop its oldest delta instead of blocking the fan-out
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(change)
+
+    async def _listen(self) -> None:
+        from redis import asyncio as aioredis
+
+        while self.subscriptions:
+            client = aioredis.Redis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(CHANNEL)
+                while self.subscriptions:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self.dispatch(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning(f"Availability subscription failed, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+                await client.close()
+
+broadcaster = Broadcaster()
@@ -1,6 +1,12 @@
+from collections import defaultdict
 from datetime import date
+from typing import List, Optional, Tuple
 from sqlmodel import Session, select, and_, or_
 from app.models.booking import Booking, BookingStatus
+from app.models.vehicle import Vehicle
+from app.services import availability_service, history_service, location_service, outbox_service, pricing_service, rollup_service
+
+ACTIVE_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
 
 def check_availability(session: Session, vehicle_id: int, start_date: date, end_date: date) -> bool:
     
@@ -15,7 +21,142 @@ def check_availability(session: Session, vehicle_id: int, start_date: date, end_
     conflicting_booking = session.exec(statement).first()
     return conflicting_booking is None
 
-def calculate_total(daily_rate: float, start_date: date, end_date: date) -> float:
-    days = (end_date - start_date).days
-    if days < 1: days = 1 
-    return days * daily_rate
+def match_pickup_location(session: Session, vehicle: Vehicle, pickup_location: str) -> Tuple[bool, Optional[int]]:
+    """
+    Whether the pickup lies in the vehicle's city, plus the pickup's location id.
+    A pickup that resolves to a canonical location ("Andheri, Mumbai" -> Mumbai)
+    must be the vehicle's own; an unknown place ("Mumbai Airport") falls back
+    to the raw text check.
+    """
+    pickup_location_id = location_service.resolve(session, pickup_location)
+    return _pickup_matches(vehicle, pickup_location, pickup_location_id), pickup_location_id
+
+def _pickup_matches(vehicle: Vehicle, pickup_location: str, pickup_location_id: Optional[int]) -> bool:
+    if vehicle.location_id is not None and pickup_location_id is not None:
+        return pickup_location_id == vehicle.location_id
+    # Unresolved pickup, or vehicle not backfilled yet: compare the raw text
+    vehicle_loc = vehicle.location.lower().strip()
+    pickup_loc = pickup_location.lower().strip()
+    return vehicle_loc in pickup_loc or pickup_loc in vehicle_loc
+
+def busy_vehicle_ids(start_date: date, end_date: date):
+    """Subquery of vehicle ids with an active booking overlapping the dates."""
+    return select(Booking.vehicle_id).where(
+        Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
+        and_(
+            Booking.start_date <= end_date,
+            Booking.end_date >= start_date
+        )
+    )
+
+def calculate_total(daily_rate: float, start_date: date, end_date: date, location: Optional[str] = None) -> float:
+    return pricing_service.quote(daily_rate, start_date, end_date, location)
+
+def _booking_payload(booking: Booking) -> dict:
+    return {
+        "booking_id": booking.id,
+        "user_id": booking.user_id,
+        "vehicle_id": booking.vehicle_id,
+        "status": booking.status.value,
+        "start_date": booking.start_date.isoformat(),
+        "end_date": booking.end_date.isoformat(),
+        "total_amount": booking.total_amount,
+    }
+
+def record_created(session: Session, booking: Booking) -> None:
+    if booking.id is None:
+        session.flush()  # assigns booking.id for the outbox event
+    rollup_service.mark_dirty(session, booking.created_at.date())
+    availability_service.queue_change(session, booking, "created")
+    outbox_service.record(session, "booking.created", booking.id, _booking_payload(booking))
+    history_service.record(session, booking.id, None, booking.status.value, "api", booking.user_id)
+
+def transition_status(
+    session: Session,
+    booking: Booking,
+    status: BookingStatus,
+    source: str = "api",
+    actor_id: Optional[int] = None,
+) -> None:
+    """
+    Single place where a booking changes state, so derived data
+    (reporting rollups, availability push), the outbox event and the
+    status history row are written in the same transaction.
+    """
+    history_service.record(session, booking.id, booking.status.value, status.value, source, actor_id)
+    booking.status = status
+    session.add(booking)
+    rollup_service.mark_dirty(session, booking.created_at.date())
+    availability_service.queue_change(session, booking, status.value)
+    outbox_service.record(session, f"booking.{status.value}", booking.id, _booking_payload(booking))
+
+def create_batch(session: Session, user_id: int, items: List, all_or_nothing: bool) -> Tuple[List[dict], List[Booking]]:
+    """
+    Validate and insert many bookings with a fixed number of queries: the
+    vehicles are loaded and row-locked in id order (so concurrent batches
+    cannot deadlock), and every existing overlapping booking and every
+    pickup alias is fetched at once. Items are also checked against each
+    other. Returns per-item results and the bookings added to the session;
+    the caller commits, or rolls back when `all_or_nothing` and anything
+    failed.
+    """
+    vehicle_ids = sorted({item.vehicle_id for item in items})
+    vehicles = {
+        vehicle.id: vehicle
+        for vehicle in session.exec(
+            select(Vehicle).where(Vehicle.id.in_(vehicle_ids)).order_by(Vehicle.id).with_for_update()
+        ).all()
+    }
+
+    taken = defaultdict(list)
+    existing = session.exec(
+        select(Booking.vehicle_id, Booking.start_date, Booking.end_date).where(
+            Booking.vehicle_id.in_(vehicle_ids),
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.start_date <= max(item.end_date for item in items),
+            Booking.end_date >= min(item.start_date for item in items),
+        )
+    ).all()
+    for vehicle_id, start, end in existing:
+        taken[vehicle_id].append((start, end))
+
+    pickup_location_ids = location_service.resolve_many(session, (item.pickup_location for item in items))
+
+    results, bookings = [], []
+    for index, item in enumerate(items):
+        vehicle = vehicles.get(item.vehicle_id)
+        error = None
+        if vehicle is None:
+            error = "Vehicle not found"
+        elif any(start <= item.end_date and end >= item.start_date for start, end in taken[vehicle.id]):
+            error = "Vehicle not available for these dates"
+        else:
+            pickup_location_id = pickup_location_ids.get(item.pickup_location)
+            if not _pickup_matches(vehicle, item.pickup_location, pickup_location_id):
+                error = f"Pickup location must be within {vehicle.location}. You selected: {item.pickup_location}"
+        if error:
+            results.append({"index": index, "vehicle_id": item.vehicle_id, "status": "failed", "error": error})
+            continue
+
+        # Later items in the batch must not overlap this one either
+        taken[vehicle.id].append((item.start_date, item.end_date))
+        booking = Booking(
+            user_id=user_id,
+            vehicle_id=vehicle.id,
+            start_date=item.start_date,
+            end_date=item.end_date,
+            pickup_location=item.pickup_location,
+            pickup_location_id=pickup_location_id,
+            total_amount=calculate_total(vehicle.daily_rate, item.start_date, item.end_date, vehicle.location),
+            status=BookingStatus.PENDING,
+        )
+        bookings.append(booking)
+        results.append({"index": index, "vehicle_id": vehicle.id, "status": "created", "booking": booking})
+
+    if bookings and not (all_or_nothing and len(bookings) < len(items)):
+        session.add_all(bookings)
+        session.flush()  # one multi-row INSERT assigns all ids
+        for booking in bookings:
+            record_created(session, booking)
+    return results, bookings
+
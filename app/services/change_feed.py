@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Union
+from sqlalchemy import BigInteger, Text, cast, func, tuple_
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.tombstone import Tombstone
+
+# (position, id). On Postgres the position is the id of the transaction that
+# last wrote the row (change_xid, set by trigger); elsewhere it is updated_at.
+Position = Tuple[Union[int, datetime], int]
+
+class InvalidCursor(ValueError):
+    pass
+
+def _uses_xids(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+def _start(xids: bool) -> Position:
+    return (0, 0) if xids else (datetime.min, 0)
+
+def encode_cursor(rows: Position, deleted: Position) -> str:
+    if isinstance(rows[0], int):
+        raw = json.dumps(["x", rows[0], rows[1], deleted[0], deleted[1]])
+    else:
+        raw = json.dumps(["t", rows[0].isoformat(), rows[1], deleted[0].isoformat(), deleted[1]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str], xids: bool = True) -> Tuple[Position, Position]:
+    if not cursor:
+        return _start(xids), _start(xids)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        kind, rows_at, rows_id, deleted_at, deleted_id = json.loads(raw)
+        if kind != ("x" if xids else "t"):
+            raise ValueError(kind)
+        parse = int if xids else datetime.fromisoformat
+        return (parse(rows_at), int(rows_id)), (parse(deleted_at), int(deleted_id))
+    except Exception:
+        raise InvalidCursor("Invalid change cursor")
+
+def record_deletion(session: Session, entity: str, entity_id: int, owner_id: Optional[int] = None) -> None:
+    session.add(Tombstone(entity=entity, entity_id=entity_id, owner_id=owner_id))
+
+def changes(
+    session: Session,
+    model,
+    columns: List,
+    entity: str,
+    cursor: Optional[str],
+    limit: int,
+    owner_id: Optional[int] = None,
+) -> dict:
+    """
+    Rows of `model` modified after the cursor and ids deleted after it, both
+    read by (position, id) keyset.
+
+    On Postgres positions are writer transaction ids and the feed stops
+    below the xmin of the current snapshot: every transaction under it has
+    finished, so no later commit can land behind the cursor however long it
+    stayed open. Other databases fall back to updated_at, holding back
+    changes younger than CHANGE_FEED_SAFETY_LAG_SECONDS, which only covers
+    transactions that commit within the lag.
+    """
+    xids = _uses_xids(session)
+    rows_from, deleted_from = decode_cursor(cursor, xids)
+    if xids:
+        horizon = session.exec(select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger))).one()
+        row_position, deleted_position = model.change_xid, Tombstone.change_xid
+        row_visible, deleted_visible = row_position < horizon, deleted_position < horizon
+    else:
+        horizon = datetime.utcnow() - timedelta(seconds=settings.CHANGE_FEED_SAFETY_LAG_SECONDS)
+        row_position, deleted_position = model.updated_at, Tombstone.deleted_at
+        row_visible, deleted_visible = row_position <= horizon, deleted_position <= horizon
+
+    statement = (
+        select(*columns, row_position.label("feed_position"))
+        .where(tuple_(row_position, model.id) > tuple_(*rows_from), row_visible)
+        .order_by(row_position, model.id)
+        .limit(limit + 1)
+    )
+    if owner_id is not None:
+        statement = statement.where(model.user_id == owner_id)
+    rows = session.exec(statement).all()
+
+    tombstones = select(Tombstone.entity_id, Tombstone.id, deleted_position.label("feed_position")).where(
+        Tombstone.entity == entity,
+        tuple_(deleted_position, Tombstone.id) > tuple_(*deleted_from),
+        deleted_visible,
+    )
+    if owner_id is not None:
+        tombstones = tombstones.where(Tombstone.owner_id == owner_id)
+    deleted = session.exec(tombstones.order_by(deleted_position, Tombstone.id).limit(limit + 1)).all()
+
+    has_more = len(rows) > limit or len(deleted) > limit
+    rows, deleted = rows[:limit], deleted[:limit]
+    if rows:
+        rows_from = (rows[-1].feed_position, rows[-1].id)
+    if deleted:
+        deleted_from = (deleted[-1].feed_position, deleted[-1].id)
+
+    items = []
+    for row in rows:
+        item = dict(row._mapping)
+        del item["feed_position"]
+        items.append(item)
+    return {
+        "items": items,
+        "deleted": [row.entity_id for row in deleted],
+        "next_cursor": encode_cursor(rows_from, deleted_from),
+        "has_more": has_more,
+    }
@@ -0,0 +1,69 @@
+import socket
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+class ScannerUnavailable(Exception):
+    pass
+
+@dataclass
+class ScanResult:
+    clean: bool
+    reason: Optional[str] = None
+
+class NoopScanner:
+    """Accepts every document. For dev/test, where no scanner daemon runs."""
+
+    def scan(self, handle: BinaryIO) -> ScanResult:
+        return ScanResult(clean=True)
+
+class ClamdScanner:
+    """
+    Streams a document to a clamd daemon with the INSTREAM command: chunks
+    prefixed with their 4-byte big-endian length, ended by an empty chunk.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def scan(self, handle: BinaryIO) -> ScanResult:
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+                conn.sendall(b"zINSTREAM\0")
+                for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+                    conn.sendall(struct.pack("!L", len(chunk)) + chunk)
+                conn.sendall(struct.pack("!L", 0))
+                reply = b""
+                while not reply.endswith(b"\0"):
+                    data = conn.recv(4096)
+                    if not data:
+                        break
+                    reply += data
+        except OSError as e:
+            raise ScannerUnavailable(f"clamd at {self.host}:{self.port}: {e}")
+
+        # "stream: OK", "stream: <signature> FOUND" or "<message> ERROR"
+        reply = reply.rstrip(b"\0").decode("utf-8", "replace")
+        if reply.endswith("OK"):
+            return ScanResult(clean=True)
+        if reply.endswith("FOUND"):
+            return ScanResult(clean=False, reason=reply.removeprefix("stream: ").removesuffix(" FOUND"))
+        raise ScannerUnavailable(f"clamd returned: {reply}")
+
+_scanners = {}
+
+def get_scanner():
+    backend = settings.KYC_SCANNER_BACKEND
+    if backend not in _scanners:
+        if backend == "none":
+            _scanners[backend] = NoopScanner()
+        elif backend == "clamd":
+            _scanners[backend] = ClamdScanner(settings.KYC_SCANNER_HOST, settings.KYC_SCANNER_PORT, settings.KYC_SCANNER_TIMEOUT)
+        else:
+            raise ValueError(f"Unknown KYC scanner backend: {backend}")
+    return _scanners[backend]
@@ -0,0 +1,26 @@
+from typing import Any, Dict
+from sqlmodel import Session
+from app.db.session import engine
+from app.models.user import User
+from app.services.outbox_service import handles
+
+# Subscribers to the booking event stream. Adding one here adds no work to
+# the request that produced the event.
+
+BOOKING_EMAILS = {
+    "booking.confirmed": "Your booking #{booking_id} is confirmed",
+    "booking.cancelled": "Your booking #{booking_id} was cancelled",
+}
+
+@handles("notifications", *BOOKING_EMAILS)
+def send_booking_email(event: Dict[str, Any]) -> None:
+    from app.worker import send_email_async
+
+    payload = event["payload"]
+    with Session(engine) as session:
+        user = session.get(User, payload["user_id"])
+    if user is None:
+        return
+    subject = BOOKING_EMAILS[event["type"]].format(booking_id=payload["booking_id"])
+    message = f"Booking #{payload['booking_id']}: {payload['start_date']} to {payload['end_date']}, total {payload['total_amount']}"
+    send_email_async.delay(user.email, subject, message)
@@ -0,0 +1,96 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from sqlmodel import Session, select
+from app.models.vehicle import Vehicle
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+REFRESH_SECONDS = 60
+
+class GridIndex:
+    """
+    In-memory spatial index: vehicles bucketed into fixed lat/lon cells.
+    A radius query only measures distances to vehicles in the cells the
+    search circle overlaps.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self.positions: Dict[int, Tuple[float, float]] = {}
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees))
+
+    def _remove(self, vehicle_id: int) -> None:
+        position = self.positions.pop(vehicle_id, None)
+        if position is not None:
+            self.cells[self._cell(*position)].discard(vehicle_id)
+
+    def upsert(self, vehicle_id: int, lat: Optional[float], lon: Optional[float]) -> None:
+        with self._lock:
+            self._remove(vehicle_id)
+            if lat is not None and lon is not None:
+                self.positions[vehicle_id] = (lat, lon)
+                self.cells[self._cell(lat, lon)].add(vehicle_id)
+
+    def remove(self, vehicle_id: int) -> None:
+        with self._lock:
+            self._remove(vehicle_id)
+
+    def load(self, rows) -> None:
+        cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        positions = {}
+        for vehicle_id, lat, lon in rows:
+            positions[vehicle_id] = (lat, lon)
+            cells[self._cell(lat, lon)].add(vehicle_id)
+        with self._lock:
+            self.cells, self.positions = cells, positions
+            self.loaded_at = time.monotonic()
+
+    def nearby(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        """(vehicle_id, distance_km) within radius, nearest first."""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(lat))
+        lon_span = 180.0 if cos_lat < 0.01 else min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+        (lat_lo, lon_lo), (lat_hi, lon_hi) = self._cell(lat - lat_span, lon - lon_span), self._cell(lat + lat_span, lon + lon_span)
+
+        with self._lock:
+            ids = [
+                vehicle_id
+                for i in range(lat_lo, lat_hi + 1)
+                for j in range(lon_lo, lon_hi + 1)
+                for vehicle_id in self.cells.get((i, j), ())
+            ]
+            coords = np.array([self.positions[v] for v in ids], dtype=np.float64).reshape(-1, 2)
+        if not ids:
+            return []
+
+        lat1, lon1 = math.radians(lat), math.radians(lon)
+        lat2, lon2 = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+        a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        within = np.flatnonzero(distances <= radius_km)
+        order = within[np.argsort(distances[within])]
+        return [(ids[i], float(distances[i])) for i in order]
+
+vehicle_index = GridIndex()
+
+def ensure_fresh(session: Session) -> GridIndex:
+    # Writes in this process update the index directly; the periodic reload
+    # picks up vehicles changed by other workers.
+    if time.monotonic() - vehicle_index.loaded_at > REFRESH_SECONDS:
+        rows = session.exec(
+            select(Vehicle.id, Vehicle.latitude, Vehicle.longitude).where(
+                Vehicle.latitude.is_not(None), Vehicle.longitude.is_not(None)
+            )
+        ).all()
+        vehicle_index.load(rows)
+    return vehicle_index
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import text
+from sqlmodel import Session, select
+from app.models.booking_event import BookingEvent
+
+def record(session: Session, booking_id: int, from_status: Optional[str], to_status: str, source: str, actor_id: Optional[int] = None) -> None:
+    session.add(BookingEvent(
+        booking_id=booking_id,
+        from_status=from_status,
+        to_status=to_status,
+        source=source,
+        actor_id=actor_id,
+    ))
+
+def for_booking(session: Session, booking_id: int) -> List[BookingEvent]:
+    # Served by ix_booking_event_booking_id_created_at in every partition
+    return session.exec(
+        select(BookingEvent).where(BookingEvent.booking_id == booking_id).order_by(BookingEvent.created_at, BookingEvent.id)
+    ).all()
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"booking_event_y{month.year}m{month.month:02d}"
+
+def ensure_partitions(session: Session, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """
+    Create the monthly partitions of booking_event from the current month up
+    to `months_ahead` months out. Creating them well in advance keeps rows out
+    of the default partition, which would block creating a partition for
+    their range later. No-op on databases without declarative partitioning.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return []
+    today = today or datetime.utcnow().date()
+    created = []
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        name = partition_name(start)
+        exists = session.exec(text("SELECT to_regclass(:name)").bindparams(name=name)).one()[0]
+        if exists is None:
+            session.exec(text(
+                f"CREATE TABLE {name} PARTITION OF booking_event "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            created.append(name)
+    session.commit()
+    return created
@@ -0,0 +1,35 @@
+from io import BytesIO
+from typing import Dict
+from PIL import Image, ImageOps
+from app.services.storage_service import LocalObjectStore
+
+# Longest edge in pixels for each variant
+VARIANTS = {"thumbnail": 160, "card": 480, "full": 1280}
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+IMAGE_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+def variant_key(sha256: str, variant: str, extension: str) -> str:
+    return f"vehicles/{sha256}/{variant}.{extension}"
+
+def generate_variants(store: LocalObjectStore, original_key: str, sha256: str) -> Dict[str, Dict[str, str]]:
+    """
+    Render every variant/format pair of an uploaded image. Keys derive from
+    the original's hash, so already rendered files are reused as-is.
+    """
+    urls: Dict[str, Dict[str, str]] = {}
+    image = None
+    for variant, size in VARIANTS.items():
+        urls[variant] = {}
+        for extension, (pil_format, options) in FORMATS.items():
+            key = variant_key(sha256, variant, extension)
+            if not store.exists(key):
+                if image is None:
+                    with store.open(original_key) as handle:
+                        image = ImageOps.exif_transpose(Image.open(handle)).convert("RGB")
+                resized = image.copy()
+                resized.thumbnail((size, size), Image.LANCZOS)
+                buffer = BytesIO()
+                resized.save(buffer, pil_format, **options)
+                store.put_bytes(key, buffer.getvalue())
+            urls[variant][extension] = store.url(key)
+    return urls
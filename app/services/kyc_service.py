@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import case, func, or_
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.user import KYCStatus, User
+
+def lease_cutoff(now: Optional[datetime] = None) -> datetime:
+    # Claims made before this have lapsed and are up for grabs again
+    return (now or datetime.utcnow()) - timedelta(minutes=settings.KYC_CLAIM_LEASE_MINUTES)
+
+def submit(user: User) -> None:
+    user.kyc_status = KYCStatus.SUBMITTED
+    user.kyc_submitted_at = datetime.utcnow()
+    # A resubmission goes back to the queue at its new position
+    release(user)
+
+def release(user: User) -> None:
+    user.kyc_claimed_by = None
+    user.kyc_claimed_at = None
+
+def claimed_by_other(user: User, reviewer_id: int) -> bool:
+    return (
+        user.kyc_claimed_by is not None
+        and user.kyc_claimed_by != reviewer_id
+        and user.kyc_claimed_at is not None
+        and user.kyc_claimed_at >= lease_cutoff()
+    )
+
+def claim(session: Session, reviewer_id: int, limit: int) -> List[User]:
+    """
+    Lease the oldest unclaimed submissions (plus the reviewer's own open
+    claims, whose lease is renewed) to `reviewer_id`. Rows another reviewer
+    is claiming right now are skipped rather than waited on, so concurrent
+    claims never return the same user. The caller commits.
+    """
+    now = datetime.utcnow()
+    users = session.exec(
+        select(User)
+        .where(
+            User.kyc_status == KYCStatus.SUBMITTED,
+            or_(
+                User.kyc_claimed_at.is_(None),
+                User.kyc_claimed_at < lease_cutoff(now),
+                User.kyc_claimed_by == reviewer_id,
+            ),
+        )
+        .order_by(User.kyc_submitted_at, User.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for user in users:
+        user.kyc_claimed_by = reviewer_id
+        user.kyc_claimed_at = now
+        session.add(user)
+    return users
+
+def record_decision(user: User) -> None:
+    user.kyc_decided_at = datetime.utcnow()
+    release(user)
+
+def _wait_seconds(session: Session):
+    if session.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", User.kyc_decided_at - User.kyc_submitted_at)
+    return (func.julianday(User.kyc_decided_at) - func.julianday(User.kyc_submitted_at)) * 86400
+
+def queue_stats(session: Session) -> dict:
+    """
+    Live queue depth and age from the partial queue index, plus throughput
+    over the last day from kyc_decided_at. Everything is read from the
+    database, so the numbers are the same on every process.
+    """
+    now = datetime.utcnow()
+    claimed = User.kyc_claimed_at >= lease_cutoff(now)
+    depth, leased, oldest = session.exec(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((claimed, 1), else_=0)), 0),
+            func.min(User.kyc_submitted_at),
+        ).where(User.kyc_status == KYCStatus.SUBMITTED)
+    ).one()
+    decided, avg_wait = session.exec(
+        select(func.count(), func.avg(_wait_seconds(session)))
+        .where(User.kyc_decided_at >= now - timedelta(days=1))
+    ).one()
+    return {
+        "depth": depth,
+        "claimed": leased,
+        "unclaimed": depth - leased,
+        "oldest_submitted_at": oldest,
+        "oldest_age_seconds": (now - oldest).total_seconds() if oldest else None,
+        "decisions_last_day": decided,
+        "avg_wait_seconds_last_day": round(float(avg_wait), 1) if avg_wait is not None else None,
+    }
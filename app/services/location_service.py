@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from app.models.location import Location, LocationAlias
+
+# alias -> location id. Aliases are never repointed, so hits stay valid for
+# the life of the process.
+_alias_cache: Dict[str, int] = {}
+# key -> monotonic expiry of a miss, so a generic key cached earlier never
+# shadows a more specific one that was simply not looked up yet. Aliases
+# added by other processes become visible once the miss expires.
+_missing: Dict[str, float] = {}
+MISS_TTL_SECONDS = 60.0
+MISS_CACHE_MAX_ENTRIES = 10000
+_lock = threading.Lock()
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().replace(".", " ").split())
+
+def candidate_keys(text: str) -> List[str]:
+    """
+    Keys to try for a free-text place, most specific first:
+    "Andheri East, Mumbai" -> ["andheri east, mumbai", "mumbai", "andheri east"].
+    """
+    keys = [normalize(text)]
+    parts = [normalize(part) for part in text.split(",")]
+    keys.extend(part for part in reversed(parts) if part)
+    return list(dict.fromkeys(k for k in keys if k))
+
+def _forget_miss(key: str) -> None:
+    with _lock:
+        _missing.pop(key, None)
+
+def _fetch(session: Session, keys: Iterable[str]) -> None:
+    """Query, in one round trip, every key that is neither cached nor a recent miss."""
+    now = time.monotonic()
+    unknown = [key for key in dict.fromkeys(keys) if key not in _alias_cache and _missing.get(key, 0.0) <= now]
+    if not unknown:
+        return
+    rows = session.exec(select(LocationAlias.alias, LocationAlias.location_id).where(LocationAlias.alias.in_(unknown))).all()
+    found = dict(rows)
+    with _lock:
+        _alias_cache.update(found)
+        if len(_missing) > MISS_CACHE_MAX_ENTRIES:
+            _missing.clear()
+        for key in unknown:
+            if key not in found:
+                _missing[key] = now + MISS_TTL_SECONDS
+
+def _most_specific(keys: Iterable[str]) -> Optional[int]:
+    for key in keys:
+        location_id = _alias_cache.get(key)
+        if location_id is not None:
+            return location_id
+    return None
+
+def _lookup(session: Session, keys: Iterable[str]) -> Optional[int]:
+    """
+    Location id of the most specific key that is a known alias. Every key
+    is either cached (hit or recent miss) or queried, so the answer does not
+    depend on what happened to be cached before.
+    """
+    keys = list(keys)
+    _fetch(session, keys)
+    return _most_specific(keys)
+
+def resolve(session: Session, text: Optional[str]) -> Optional[int]:
+    """Location id for a free-text place, or None if it is not a known location."""
+    if not text:
+        return None
+    return _lookup(session, candidate_keys(text))
+
+def resolve_many(session: Session, texts: Iterable[Optional[str]]) -> Dict[str, Optional[int]]:
+    """Like `resolve` for each distinct text, with at most one query for all of them."""
+    keys = {text: candidate_keys(text) for text in set(texts) if text}
+    _fetch(session, (key for text_keys in keys.values() for key in text_keys))
+    return {text: _most_specific(text_keys) for text, text_keys in keys.items()}
+
+def canonicalize_location(session: Session, name: str) -> int:
+    """
+    Location id for a city name, creating the location on first use. Used
+    when vehicles are written so every vehicle points at a canonical row.
+    """
+    location_id = resolve(session, name)
+    if location_id is not None:
+        return location_id
+
+    key = normalize(name)
+    try:
+        with session.begin_nested():
+            location = Location(name=name.strip(), key=key)
+            session.add(location)
+            session.flush()
+            session.add(LocationAlias(alias=key, location_id=location.id))
+            session.flush()
+    except IntegrityError:
+        # Another request created it first
+        _forget_miss(key)
+        location_id = _lookup(session, [key])
+        if location_id is None:
+            raise
+        return location_id
+    with _lock:
+        _alias_cache[key] = location.id
+        _missing.pop(key, None)
+    return location.id
+
+def add_alias(session: Session, location_id: int, alias: str) -> LocationAlias:
+    row = LocationAlias(alias=normalize(alias), location_id=location_id)
+    session.add(row)
+    _forget_miss(row.alias)
+    return row
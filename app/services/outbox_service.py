@@ -0,0 +1,157 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.helpers.redis_client import redis_client
+from app.models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], None]
+
+# consumer group -> event type -> handler. Each group gets every event once;
+# handlers must tolerate redelivery (delivery is at least once).
+HANDLERS: Dict[str, Dict[str, Handler]] = {}
+
+def handles(group: str, *event_types: str):
+    def register(handler: Handler) -> Handler:
+        for event_type in event_types:
+            HANDLERS.setdefault(group, {})[event_type] = handler
+        return handler
+    return register
+
+def record(session: Session, event_type: str, aggregate_id: int, payload: Dict[str, Any]) -> None:
+    """Add an event to the outbox; it is committed (or not) with the caller's transaction."""
+    session.add(OutboxEvent(event_type=event_type, aggregate_id=aggregate_id, payload=payload))
+
+def relay_batch(session: Session, batch_size: Optional[int] = None) -> int:
+    """
+    Publish the oldest unpublished events to the stream in one pipeline.
+    Rows are claimed with SKIP LOCKED so several relays can run at once;
+    if Redis fails the transaction rolls back and the rows are retried.
+    """
+    events = session.exec(
+        select(OutboxEvent)
+        .where(OutboxEvent.published_at.is_(None))
+        .order_by(OutboxEvent.id)
+        .limit(batch_size or settings.OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not events:
+        session.rollback()
+        return 0
+
+    pipe = redis_client.pipeline(transaction=False)
+    for outbox_event in events:
+        pipe.xadd(
+            settings.OUTBOX_STREAM,
+            {
+                "id": outbox_event.id,
+                "type": outbox_event.event_type,
+                "aggregate_id": outbox_event.aggregate_id,
+                "payload": json.dumps(outbox_event.payload),
+                "created_at": outbox_event.created_at.isoformat(),
+            },
+            maxlen=settings.OUTBOX_STREAM_MAXLEN,
+            approximate=True,
+        )
+    pipe.execute()
+
+    now = datetime.utcnow()
+    for outbox_event in events:
+        outbox_event.published_at = now
+        session.add(outbox_event)
+    session.commit()
+    return len(events)
+
+def purge_published(session: Session) -> None:
+    cutoff = datetime.utcnow() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    session.exec(delete(OutboxEvent).where(OutboxEvent.published_at < cutoff))
+    session.commit()
+
+def _ensure_group(group: str) -> None:
+    try:
+        redis_client.xgroup_create(settings.OUTBOX_STREAM, group, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+def _decode(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    event = {key.decode(): value.decode() for key, value in fields.items()}
+    event["payload"] = json.loads(event["payload"])
+    return event
+
+def _delivery_counts(group: str, message_ids: List) -> Dict[Any, int]:
+    pipe = redis_client.pipeline(transaction=False)
+    for message_id in message_ids:
+        pipe.xpending_range(settings.OUTBOX_STREAM, group, min=message_id, max=message_id, count=1)
+    counts = {}
+    for entries in pipe.execute():
+        for entry in entries:
+            counts[entry["message_id"]] = entry["times_delivered"]
+    return counts
+
+def _dead_letter(group: str, messages: List, counts: Dict[Any, int]) -> None:
+    pipe = redis_client.pipeline(transaction=False)
+    for message_id, fields in messages:
+        pipe.xadd(
+            settings.OUTBOX_DEAD_LETTER_STREAM,
+            {**fields, "group": group, "message_id": message_id, "times_delivered": counts[message_id]},
+            maxlen=settings.OUTBOX_STREAM_MAXLEN,
+            approximate=True,
+        )
+    pipe.xack(settings.OUTBOX_STREAM, group, *(message_id for message_id, _ in messages))
+    pipe.execute()
+    for message_id, fields in messages:
+        logger.error(
+            f"{group}: event {fields.get(b'id', b'?').decode()} (message {message_id.decode()}) failed "
+            f"{counts[message_id]} deliveries, moved to {settings.OUTBOX_DEAD_LETTER_STREAM}"
+        )
+
+def consume(group: str, consumer: str, count: int = 100, min_idle_ms: int = 60000) -> Tuple[int, int]:
+    """
+    Process one batch for a consumer group: first messages another consumer
+    took but never acknowledged (crashed worker or failed handler), then new
+    ones. Returns (handled, failed). Failed messages stay pending and are
+    retried later, until OUTBOX_MAX_DELIVERIES sends them to the dead-letter
+    stream so a poison event cannot be reclaimed forever.
+    """
+    _ensure_group(group)
+    handlers = HANDLERS.get(group, {})
+
+    _, claimed, *_ = redis_client.xautoclaim(settings.OUTBOX_STREAM, group, consumer, min_idle_ms, "0-0", count=count)
+    dead: List = []
+    if claimed:
+        counts = _delivery_counts(group, [message_id for message_id, _ in claimed])
+        dead = [(message_id, fields) for message_id, fields in claimed
+                if fields and counts.get(message_id, 0) > settings.OUTBOX_MAX_DELIVERIES]
+        if dead:
+            _dead_letter(group, dead, counts)
+    dead_ids = {message_id for message_id, _ in dead}
+    messages: List = [message for message in claimed if message[0] not in dead_ids]
+    fresh = redis_client.xreadgroup(group, consumer, {settings.OUTBOX_STREAM: ">"}, count=count)
+    for _, stream_messages in fresh:
+        messages.extend(stream_messages)
+
+    handled, failed, done = 0, 0, []
+    for message_id, fields in messages:
+        if not fields:
+            # Trimmed from the stream while pending; nothing left to process
+            done.append(message_id)
+            continue
+        event = _decode(fields)
+        handler = handlers.get(event["type"])
+        try:
+            if handler is not None:
+                handler(event)
+            done.append(message_id)
+            handled += 1
+        except Exception as e:
+            failed += 1
+            logger.warning(f"{group}: handler for event {event['id']} ({event['type']}) failed: {e}")
+    if done:
+        redis_client.xack(settings.OUTBOX_STREAM, group, *done)
+    return handled, failed + len(dead)
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import settings
+
+class RateTable:
+    """
+    Precompiled price multipliers for one location over a calendar span.
+
+    Stored as a prefix sum so the multiplier total for any [start, end)
+    rental is two array lookups, independent of rental length.
+    """
+
+    def __init__(self, origin: date, multipliers: np.ndarray):
+        self.origin = origin
+        self.days = len(multipliers)
+        self.cumulative = np.concatenate(([0.0], np.cumsum(multipliers)))
+
+    def covers(self, start_date: date, end_date: date) -> bool:
+        return start_date >= self.origin and (end_date - self.origin).days <= self.days
+
+    def units(self, start_date: date, end_date: date) -> float:
+        s = (start_date - self.origin).days
+        e = (end_date - self.origin).days
+        return float(self.cumulative[e] - self.cumulative[s])
+
+_tables: Dict[str, RateTable] = {}
+
+def _location_key(location: Optional[str]) -> str:
+    return (location or "").lower().strip()
+
+def _day_multipliers(origin: date, n_days: int, location_key: str) -> np.ndarray:
+    days = np.datetime64(origin, "D") + np.arange(n_days)
+    # 1970-01-01 was a Thursday, so (epoch day + 3) % 7 gives Monday=0
+    weekday = (days.astype(np.int64) + 3) % 7
+    month = days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+
+    seasonal = np.ones(13)
+    for m, multiplier in settings.PRICING_SEASONAL_MULTIPLIERS.items():
+        seasonal[m] = multiplier
+
+    multipliers = seasonal[month]
+    multipliers[weekday >= 5] *= settings.PRICING_WEEKEND_MULTIPLIER
+    return multipliers * settings.PRICING_LOCATION_MULTIPLIERS.get(location_key, 1.0)
+
+def _table_origin(today: date) -> date:
+    # Start a year back so recent bookings can be re-quoted from the same table
+    return date(today.year - 1, 1, 1)
+
+def get_rate_table(location: Optional[str]) -> RateTable:
+    key = _location_key(location)
+    origin = _table_origin(date.today())
+    table = _tables.get(key)
+    if table is None or table.origin != origin:
+        table = RateTable(origin, _day_multipliers(origin, settings.PRICING_TABLE_DAYS, key))
+        _tables[key] = table
+    return table
+
+def _billable_window(start_date: date, end_date: date) -> Tuple[date, int]:
+    days = (end_date - start_date).days
+    if days < 1:
+        days = 1
+    return start_date + timedelta(days=days), days
+
+def long_rental_multiplier(days: int) -> float:
+    multiplier = 1.0
+    for min_days, tier_multiplier in sorted(settings.PRICING_LONG_RENTAL_MULTIPLIERS.items()):
+        if days >= min_days:
+            multiplier = tier_multiplier
+    return multiplier
+
+def _units(location_key: str, start_date: date, end_date: date) -> float:
+    table = get_rate_table(location_key)
+    if table.covers(start_date, end_date):
+        return table.units(start_date, end_date)
+    # Outside the precompiled span: compute this window directly
+    return float(_day_multipliers(start_date, (end_date - start_date).days, location_key).sum())
+
+def quote(daily_rate: float, start_date: date, end_date: date, location: Optional[str] = None) -> float:
+    end_date, days = _billable_window(start_date, end_date)
+    units = _units(_location_key(location), start_date, end_date)
+    return round(daily_rate * units * long_rental_multiplier(days), 2)
+
+def quote_many(vehicles: Sequence, start_date: date, end_date: date) -> np.ndarray:
+    """
+    Totals for many vehicles over the same dates. Each distinct location is
+    resolved once; the per-vehicle work is a single vectorized multiply.
+    """
+    end_date, days = _billable_window(start_date, end_date)
+    if not vehicles:
+        return np.zeros(0)
+
+    keys = [_location_key(v.location) for v in vehicles]
+    unique_keys, key_index = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    units = np.array([_units(key, start_date, end_date) for key in unique_keys])
+    rates = np.fromiter((v.daily_rate for v in vehicles), dtype=np.float64, count=len(vehicles))
+    return np.round(rates * units[key_index] * long_rental_multiplier(days), 2)
@@ -0,0 +1,136 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import case, delete, func
+from sqlmodel import Session, select
+from app.models.booking import BookingStatus
+from app.models.vehicle import Vehicle
+from app.models.rollup import DailyRollup, RollupDirtyDay
+from app.services import archive_service
+
+CONVERTED_STATUSES = [BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
+
+def mark_dirty(session: Session, day: date) -> None:
+    # Bookings are attributed to the day they were created on, so any change
+    # to a booking invalidates the rollup row of its creation day.
+    session.add(RollupDirtyDay(day=day))
+
+def _rental_days(session: Session, bookings):
+    if session.get_bind().dialect.name == "postgresql":
+        return bookings.c.end_date - bookings.c.start_date
+    return func.julianday(bookings.c.end_date) - func.julianday(bookings.c.start_date)
+
+def rebuild_days(session: Session, days: List[date]) -> int:
+    """
+    Recompute the rollup rows for the given days with one grouped query.
+    The caller owns the transaction.
+    """
+    if not days:
+        return 0
+
+    # Archived bookings count too, so rebuilding old ranges stays correct
+    bookings = archive_service.all_bookings()
+    converted = bookings.c.status.in_(CONVERTED_STATUSES)
+    day_col = func.date(bookings.c.created_at)
+    statement = (
+        select(
+            day_col,
+            bookings.c.vehicle_id,
+            Vehicle.location,
+            func.count(bookings.c.id),
+            func.sum(case((converted, 1), else_=0)),
+            func.sum(case((bookings.c.status == BookingStatus.CANCELLED, 1), else_=0)),
+            func.sum(case((converted, _rental_days(session, bookings)), else_=0)),
+            func.sum(case((converted, bookings.c.total_amount), else_=0.0)),
+        )
+        .join(Vehicle, Vehicle.id == bookings.c.vehicle_id)
+        .where(
+            bookings.c.created_at >= datetime.combine(min(days), datetime.min.time()),
+            bookings.c.created_at < datetime.combine(max(days) + timedelta(days=1), datetime.min.time()),
+            day_col.in_(days),
+        )
+        .group_by(day_col, bookings.c.vehicle_id, Vehicle.location)
+    )
+    rows = session.exec(statement).all()
+
+    session.execute(delete(DailyRollup).where(DailyRollup.day.in_(days)))
+    now = datetime.utcnow()
+    for day, vehicle_id, location, created, confirmed, cancelled, booked_days, revenue in rows:
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        session.add(DailyRollup(
+            day=day,
+            vehicle_id=vehicle_id,
+            location=location,
+            bookings_created=created,
+            bookings_confirmed=confirmed or 0,
+            cancellations=cancelled or 0,
+            booked_days=int(booked_days or 0),
+            revenue=float(revenue or 0.0),
+            refreshed_at=now,
+        ))
+    return len(rows)
+
+def refresh_dirty_days(session: Session, batch_size: int = 1000) -> List[date]:
+    """
+    Rebuild only the days flagged since the last run, then clear the flags.
+    """
+    marks = session.exec(
+        select(RollupDirtyDay.id, RollupDirtyDay.day).order_by(RollupDirtyDay.id).limit(batch_size)
+    ).all()
+    if not marks:
+        return []
+
+    days = sorted({day for _, day in marks})
+    rebuild_days(session, days)
+    # Exactly the marks read: a transaction that got a lower id but commits
+    # later must keep its mark for the next run
+    session.execute(delete(RollupDirtyDay).where(RollupDirtyDay.id.in_([mark_id for mark_id, _ in marks])))
+    session.commit()
+    return days
+
+def rebuild_range(session: Session, start_date: date, end_date: date) -> int:
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    count = 0
+    # Keep each statement's IN list bounded for long backfills
+    for i in range(0, len(days), 31):
+        count += rebuild_days(session, days[i:i + 31])
+        session.commit()
+    return count
+
+def summarize(
+    session: Session,
+    start_date: date,
+    end_date: date,
+    group_by: str = "location",
+    location: Optional[str] = None,
+) -> list:
+    key_col = {
+        "location": DailyRollup.location,
+        "vehicle": DailyRollup.vehicle_id,
+        "day": DailyRollup.day,
+    }[group_by]
+
+    statement = select(
+        key_col,
+        func.sum(DailyRollup.bookings_created),
+        func.sum(DailyRollup.bookings_confirmed),
+        func.sum(DailyRollup.cancellations),
+        func.sum(DailyRollup.booked_days),
+        func.sum(DailyRollup.revenue),
+    ).where(DailyRollup.day >= start_date, DailyRollup.day <= end_date)
+    if location:
+        statement = statement.where(DailyRollup.location == location)
+    statement = statement.group_by(key_col).order_by(key_col)
+
+    summaries = []
+    for key, created, confirmed, cancelled, booked_days, revenue in session.exec(statement).all():
+        summaries.append({
+            "key": str(key),
+            "bookings_created": created or 0,
+            "bookings_confirmed": confirmed or 0,
+            "cancellations": cancelled or 0,
+            "booked_days": booked_days or 0,
+            "revenue": float(revenue or 0.0),
+            "conversion_rate": (confirmed / created) if created else None,
+        })
+    return summaries
@@ -0,0 +1,136 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Tuple
+from sqlalchemy import Text, and_, cast, func, literal, literal_column, or_
+from sqlmodel import Session, select
+from app.models.vehicle import Vehicle
+
+SUGGEST_REFRESH_SECONDS = 60
+
+_SPACE = literal_column("' '")
+_TOKEN = re.compile(r"\w+")
+
+def search_document():
+    # Must stay identical to the expression behind ix_vehicle_search_tsv and
+    # ix_vehicle_search_trgm, otherwise Postgres will not use the indexes
+    return func.lower(
+        Vehicle.make + _SPACE + Vehicle.model + _SPACE + cast(Vehicle.year, Text) + _SPACE + Vehicle.location
+    )
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+def search(session: Session, columns: List, q: str, skip: int = 0, limit: int = 20):
+    """
+    Vehicles matching every word of `q` in make/model/year/location, best
+    matches first. Words match as prefixes ("toy" finds Toyota); on Postgres
+    trigram similarity also catches typos ("toyta").
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return []
+    document = search_document()
+
+    if session.get_bind().dialect.name == "postgresql":
+        ts_vector = func.to_tsvector(literal_column("'simple'"), document)
+        ts_query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{t}:*" for t in tokens))
+        phrase = literal(" ".join(tokens))
+        rank = func.ts_rank_cd(ts_vector, ts_query) + func.word_similarity(phrase, document)
+        # Each word must match, as a prefix or, failing that, as a near miss
+        word_matches = [
+            or_(
+                ts_vector.op("@@")(func.to_tsquery(literal_column("'simple'"), f"{t}:*")),
+                literal(t).op("<%")(document),
+            )
+            for t in tokens
+        ]
+        statement = (
+            select(*columns)
+            .where(and_(*word_matches))
+            .order_by(rank.desc(), Vehicle.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return session.exec(statement).all()
+
+    # Portable fallback (SQLite in dev/benchmarks): substring match of every
+    # word, shortest (most specific) documents first
+    statement = (
+        select(*columns)
+        .where(and_(*(document.like(f"%{t}%") for t in tokens)))
+        .order_by(func.length(document), Vehicle.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return session.exec(statement).all()
+
+class PrefixIndex:
+    """
+    Autocomplete over makes, "make model" pairs and locations, held as a
+    sorted list so a lookup is a binary search plus a short scan. Every word
+    of a phrase is indexed, so "cam" suggests "Toyota Camry".
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[str, str, int]] = []
+        self.keys: List[str] = []
+        self.kinds: Dict[str, str] = {}
+        self.loaded_at = 0.0
+        self.stale = True
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self.stale = True
+
+    def load(self, rows) -> None:
+        weights: Counter = Counter()
+        kinds = {}
+        for make, model, location, count in rows:
+            for kind, term in (("make", make), ("model", f"{make} {model}"), ("location", location)):
+                term = " ".join(term.split())
+                weights[term] += count
+                kinds[term] = kind
+
+        entries = []
+        for term, weight in weights.items():
+            words = term.lower().split()
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), term, weight))
+        entries.sort()
+        with self._lock:
+            self.entries = entries
+            self.keys = [entry[0] for entry in entries]
+            self.kinds = kinds
+            self.loaded_at = time.monotonic()
+            self.stale = False
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        with self._lock:
+            entries, keys, kinds = self.entries, self.keys, self.kinds
+        matches = {}
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key, term, weight = entries[i]
+            if not key.startswith(prefix):
+                break
+            matches[term] = weight
+        ranked = sorted(matches.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{"text": term, "kind": kinds[term], "count": weight} for term, weight in ranked]
+
+suggestions = PrefixIndex()
+
+def ensure_suggestions(session: Session) -> PrefixIndex:
+    # Vehicle writes in this process invalidate the index; the TTL picks up
+    # writes made by other workers
+    if suggestions.stale or time.monotonic() - suggestions.loaded_at > SUGGEST_REFRESH_SECONDS:
+        rows = session.exec(
+            select(Vehicle.make, Vehicle.model, Vehicle.location, func.count(Vehicle.id))
+            .group_by(Vehicle.make, Vehicle.model, Vehicle.location)
+        ).all()
+        suggestions.load(rows)
+    return suggestions
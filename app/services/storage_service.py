@@ -0,0 +1,106 @@
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable, BinaryIO
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+class ObjectTooLarge(Exception):
+    pass
+
+@dataclass
+class StagedObject:
+    path: Path
+    sha256: str
+    size: int
+
+class LocalObjectStore:
+    """
+    Filesystem backend for dev/test. Objects are written to a temp file first
+    and renamed into place, so readers never see partial content and
+    content-addressed keys deduplicate for free.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.tmp_dir = self.root / ".tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def new_temp(self) -> Path:
+        return self.tmp_dir / uuid.uuid4().hex
+
+    def commit(self, staged: StagedObject, key: str) -> bool:
+        """Move a staged file to `key`. Returns False if identical content was already stored."""
+        target = self.path(key)
+        if target.exists():
+            staged.path.unlink(missing_ok=True)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged.path, target)
+        return True
+
+    def discard(self, staged: StagedObject) -> None:
+        staged.path.unlink(missing_ok=True)
+
+    def move(self, key: str, new_key: str) -> None:
+        target = self.path(new_key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path(key), target)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.new_temp()
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def url(self, key: str) -> str:
+        return f"{settings.OBJECT_STORE_PUBLIC_URL}/{key}"
+
+_stores = {}
+
+def get_object_store() -> LocalObjectStore:
+    backend = settings.OBJECT_STORE_BACKEND
+    if backend not in _stores:
+        if backend == "local":
+            _stores[backend] = LocalObjectStore(settings.OBJECT_STORE_ROOT)
+        else:
+            raise ValueError(f"Unknown object store backend: {backend}")
+    return _stores[backend]
+
+async def stage_stream(store: LocalObjectStore, chunks: AsyncIterable[bytes], max_bytes: int) -> StagedObject:
+    """
+    Write an incoming stream to a temp object, hashing as it goes and
+    aborting as soon as it grows past `max_bytes`.
+    """
+    path = store.new_temp()
+    digest = hashlib.sha256()
+    size = 0
+    handle = open(path, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise ObjectTooLarge(f"Upload exceeds {max_bytes} bytes")
+            digest.update(chunk)
+            await run_in_threadpool(handle.write, chunk)
+    except BaseException:
+        handle.close()
+        path.unlink(missing_ok=True)
+        raise
+    handle.close()
+    return StagedObject(path=path, sha256=digest.hexdigest(), size=size)
@@ -1,4 +1,6 @@
 import re
+from functools import lru_cache
+from typing import Optional, Tuple
 import requests
 
 def validate_phone(phone: str) -> bool:
@@ -12,6 +14,21 @@ def validate_phone(phone: str) -> bool:
     pattern = re.compile(r"^\+?[1-9]\d{1,14}$")
     return bool(pattern.match(phone))
 
+@lru_cache(maxsize=4096)
+def _resolve_city(location: str) -> Tuple[Tuple[float, float], ...]:
+    """
+    Nominatim search results for a city as (lat, lon) pairs, cached per process.
+    Raises on transport/API errors so failures are not cached.
+    """
+    url = "https://nominatim.openstreetmap.org/search"
+    headers = {'User-Agent': 'CarRentalApp/1.0'}
+    response = requests.get(url, params={"q": location, "format": "json", "limit": 1}, headers=headers, timeout=5)
+    response.raise_for_status()
+    return tuple((float(item["lat"]), float(item["lon"])) for item in response.json())
+
+def _city_key(location: str) -> str:
+    return " ".join(location.lower().split())
+
 def validate_city(location: str) -> bool:
     """
     Validates if a city/location exists using OpenStreetMap Nominatim API.
@@ -20,14 +37,20 @@ def validate_city(location: str) -> bool:
     if not location:
         return False
     try:
-        # Use Nominatim for basic city validation
-        url = f"https://nominatim.openstreetmap.org/search?q={location}&format=json"
-        headers = {'User-Agent': 'CarRentalApp/1.0'}
-        response = requests.get(url, headers=headers, timeout=5)
-        if response.status_code != 200:
-             return True # Fail open if external service issue
-        data = response.json()
-        return len(data) > 0
+        return len(_resolve_city(_city_key(location))) > 0
     except Exception as e:
         print(f"Validation error: {e}")
         return True # Fail open if API is down
+
+def geocode_city(location: str) -> Optional[Tuple[float, float]]:
+    """
+    (latitude, longitude) of a city, or None if unknown or the API is down.
+    """
+    if not location:
+        return None
+    try:
+        results = _resolve_city(_city_key(location))
+    except Exception as e:
+        print(f"Geocoding error: {e}")
+        return None
+    return results[0] if results else None
@@ -1,18 +1,81 @@
+import random
+import sys
+import time
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import before_task_publish, task_prerun, task_postrun, task_failure
+from kombu import Queue
 from app.core.config import settings
+from app.helpers import catalog_cache, metrics
 from sqlmodel import Session, select
 from app.db.session import engine
 from app.models.booking import Booking, BookingStatus
+from app.models.user import KYCStatus, User
+from app.models.vehicle import Vehicle
 from datetime import date
+from app.services import archive_service, booking_service, document_scanner, event_handlers, history_service, kyc_service, outbox_service, rollup_service, storage_service
 
-celery_app = Celery("worker", broker=settings.CELERY_BROKER_URL, backend=settings.CELERY_RESULT_BACKEND)
+# main must be the import path: under `python -m app.worker` this module is
+# __main__, and task names (app.worker.<fn>) are derived from it
+celery_app = Celery("app.worker", broker=settings.CELERY_BROKER_URL, backend=settings.CELERY_RESULT_BACKEND)
 
 celery_app.conf.timezone = "UTC"
+
+# Queue topology: booking state transitions must never wait behind a burst of
+# emails, so each class of work has its own queue and its own worker pool
+# (see `python -m app.worker <queue>`).
+celery_app.conf.task_queues = (
+    Queue("critical"),
+    Queue("default"),
+    Queue("notifications"),
+    Queue("media"),
+)
+celery_app.conf.task_default_queue = "default"
+celery_app.conf.task_routes = {
+    "app.worker.check_expired_bookings": {"queue": "critical"},
+    "app.worker.refresh_daily_rollups": {"queue": "default"},
+    "app.worker.rebuild_rollups": {"queue": "default"},
+    "app.worker.process_kyc_document": {"queue": "default"},
+    "app.worker.generate_vehicle_image_variants": {"queue": "media"},
+    "app.worker.geocode_vehicles": {"queue": "default"},
+    "app.worker.relay_outbox": {"queue": "critical"},
+    "app.worker.create_booking_event_partitions": {"queue": "default"},
+    "app.worker.archive_bookings": {"queue": "default"},
+    "app.worker.consume_events": {"queue": "notifications"},
+    "app.worker.send_tomorrow_reminders": {"queue": "notifications"},
+    "app.worker.send_email_async": {"queue": "notifications"},
+}
+# Most tasks are fire-and-forget; only tasks that opt in write to the result backend
+celery_app.conf.task_ignore_result = True
 celery_app.conf.beat_schedule = {
     "check-expired-bookings-every-15-min": {
         "task": "app.worker.check_expired_bookings",
         "schedule": crontab(minute="*/15"),
+        # A sweep that could not start before the next one is due is redundant
+        "options": {"expires": 14 * 60},
+    },
+    # The relay is a short SKIP LOCKED batch, so a tight interval is cheap
+    "relay-outbox-every-2-sec": {
+        "task": "app.worker.relay_outbox",
+        "schedule": 2.0,
+        "options": {"expires": 2},
+    },
+    "consume-events-every-2-sec": {
+        "task": "app.worker.consume_events",
+        "schedule": 2.0,
+        "options": {"expires": 2},
+    },
+    "refresh-daily-rollups-every-5-min": {
+        "task": "app.worker.refresh_daily_rollups",
+        "schedule": crontab(minute="*/5"),
+    },
+    "create-booking-event-partitions-daily": {
+        "task": "app.worker.create_booking_event_partitions",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "archive-bookings-nightly": {
+        "task": "app.worker.archive_bookings",
+        "schedule": crontab(hour=2, minute=15),
     },
     "daily-reminder": {
         "task": "app.worker.send_tomorrow_reminders",
@@ -38,8 +101,7 @@ def check_expired_bookings():
         
         for booking in expired_active_bookings:
             print(f"Completing booking {booking.id} (End date: {booking.end_date})")
-            booking.status = BookingStatus.COMPLETED
-            session.add(booking)
+            booking_service.transition_status(session, booking, BookingStatus.COMPLETED, source="worker")
             
         # 2. Mark PENDING bookings as CANCELLED if start_date < today (expired request)
         statement_cancelled = select(Booking).where(
@@ -50,8 +112,7 @@ def check_expired_bookings():
         
         for booking in expired_pending_bookings:
             print(f"Cancelling expired pending booking {booking.id} (Start date: {booking.start_date})")
-            booking.status = BookingStatus.CANCELLED
-            session.add(booking)
+            booking_service.transition_status(session, booking, BookingStatus.CANCELLED, source="worker")
 
         session.commit()
         
@@ -69,8 +130,7 @@ def check_expired_bookings():
 
         for booking in timeout_bookings:
             print(f"Cancelling timed-out booking {booking.id} (Created at: {booking.created_at})")
-            booking.status = BookingStatus.CANCELLED
-            session.add(booking)
+            booking_service.transition_status(session, booking, BookingStatus.CANCELLED, source="worker")
             
         session.commit()
         
@@ -79,6 +139,162 @@ def check_expired_bookings():
 
     return f"Checked bookings. Completed: {count_completed}, Cancelled: {count_cancelled}"
 
+@celery_app.task
+def refresh_daily_rollups():
+    with Session(engine) as session:
+        days = rollup_service.refresh_dirty_days(session)
+    return f"Refreshed rollups for {len(days)} day(s)"
+
+@celery_app.task(ignore_result=False)
+def rebuild_rollups(start_date: str, end_date: str):
+    with Session(engine) as session:
+        count = rollup_service.rebuild_range(session, date.fromisoformat(start_date), date.fromisoformat(end_date))
+    return f"Rebuilt {count} rollup row(s)"
+
+@celery_app.task(
+    acks_late=True,
+    autoretry_for=(document_scanner.ScannerUnavailable,),
+    retry_backoff=True,
+    max_retries=8,
+)
+def process_kyc_document(user_id: int, key: str):
+    # Post-upload pipeline for KYC documents: integrity, then the configured
+    # scanner. A failing document is quarantined and the submission rejected.
+    import hashlib
+
+    store = storage_service.get_object_store()
+    if not store.exists(key):
+        return f"KYC document {key} for user {user_id} not found"
+
+    digest = hashlib.sha256()
+    with store.open(key) as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    if not key.split("/")[-1].startswith(digest.hexdigest()):
+        return _reject_kyc_document(store, user_id, key, "integrity check failed")
+
+    with store.open(key) as handle:
+        result = document_scanner.get_scanner().scan(handle)
+    if not result.clean:
+        return _reject_kyc_document(store, user_id, key, f"scanner: {result.reason}")
+
+    print(f"KYC document {key} for user {user_id} ready for review")
+    return True
+
+def _reject_kyc_document(store, user_id: int, key: str, reason: str) -> str:
+    # Content-addressed keys may be shared by several uploads of the same file,
+    # so every user still pointing at the key is rejected. Users are detached
+    # first, so nothing references the object by the time it moves.
+    with Session(engine) as session:
+        users = session.exec(select(User).where(User.kyc_document_key == key).with_for_update()).all()
+        for user in users:
+            user.kyc_document_key = None
+            user.kyc_document_url = None
+            if user.kyc_status == KYCStatus.SUBMITTED:
+                user.kyc_status = KYCStatus.REJECTED
+                user.kyc_verified = False
+                kyc_service.record_decision(user)
+            session.add(user)
+        session.commit()
+    store.move(key, f"quarantine/{key}")
+    print(f"KYC document {key} for user {user_id} quarantined: {reason}")
+    return f"KYC document {key} quarantined: {reason}"
+
+@celery_app.task(acks_late=True)
+def generate_vehicle_image_variants(vehicle_id: int, original_key: str, sha256: str):
+    # CPU-bound resizing runs on the media queue, never in an API worker
+    from app.services import image_service
+
+    store = storage_service.get_object_store()
+    variants = image_service.generate_variants(store, original_key, sha256)
+    with Session(engine) as session:
+        # Locked so a concurrent upload cannot slip in between the check and the write
+        vehicle = session.get(Vehicle, vehicle_id, with_for_update=True)
+        if not vehicle:
+            return f"Vehicle {vehicle_id} no longer exists"
+        if vehicle.image_url != store.url(original_key):
+            # A newer image was attached while this one rendered; its own task sets the variants
+            return f"Vehicle {vehicle_id} image changed, skipped variants of {original_key}"
+        vehicle.image_variants = variants
+        vehicle.image_url = variants["full"]["jpeg"]
+        session.add(vehicle)
+        session.commit()
+    catalog_cache.bump_version()
+    return f"Generated image variants for vehicle {vehicle_id}"
+
+@celery_app.task
+def relay_outbox(max_batches: int = 20):
+    relayed = 0
+    with Session(engine) as session:
+        for _ in range(max_batches):
+            count = outbox_service.relay_batch(session)
+            relayed += count
+            if count < settings.OUTBOX_BATCH_SIZE:
+                break
+        if relayed and random.random() < 0.01:
+            outbox_service.purge_published(session)
+    return f"Relayed {relayed} outbox event(s)"
+
+@celery_app.task
+def consume_events(max_batches: int = 20):
+    # Every registered consumer group drains its share of the stream. The
+    # consumer name is per worker process so crashed workers' messages can be
+    # reclaimed by the others.
+    import os
+    import socket
+
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    results = {}
+    for group in outbox_service.HANDLERS:
+        handled = failed = 0
+        for _ in range(max_batches):
+            batch_handled, batch_failed = outbox_service.consume(group, consumer)
+            handled += batch_handled
+            failed += batch_failed
+            if batch_handled + batch_failed == 0:
+                break
+        results[group] = {"handled": handled, "failed": failed}
+    return results
+
+@celery_app.task
+def create_booking_event_partitions(months_ahead: int = 3):
+    with Session(engine) as session:
+        created = history_service.ensure_partitions(session, months_ahead)
+    return f"Created partitions: {', '.join(created) or 'none'}"
+
+@celery_app.task
+def archive_bookings(max_batches: int = 100):
+    # Small batches keep row locks and WAL bursts short; the nightly run
+    # catches up over several nights after a long pause
+    cutoff = archive_service.archive_cutoff()
+    archived = 0
+    with Session(engine) as session:
+        for _ in range(max_batches):
+            count = archive_service.archive_batch(session, cutoff)
+            archived += count
+            if count < settings.BOOKING_ARCHIVE_BATCH_SIZE:
+                break
+    return f"Archived {archived} booking(s) that ended before {cutoff}"
+
+@celery_app.task
+def geocode_vehicles():
+    # Backfill for vehicles created before coordinates existed. Each distinct
+    # city is resolved once thanks to the cached resolver.
+    from app.utils import geocode_city
+
+    with Session(engine) as session:
+        vehicles = session.exec(select(Vehicle).where(Vehicle.latitude.is_(None))).all()
+        located = 0
+        for vehicle in vehicles:
+            coordinates = geocode_city(vehicle.location)
+            if coordinates:
+                vehicle.latitude, vehicle.longitude = coordinates
+                session.add(vehicle)
+                located += 1
+        session.commit()
+    catalog_cache.bump_version()
+    return f"Geocoded {located} of {len(vehicles)} vehicle(s)"
+
 @celery_app.task
 def send_tomorrow_reminders():
     print("Sending reminders...")
@@ -90,3 +306,58 @@ def send_email_async(email: str, subject: str, message: str):
     time.sleep(2) 
     print(f"Sent email to {email}: {subject}")
     return True
+
+
+# Task metrics: queue lag (publish -> start) and run duration per task,
+# buffered in process and flushed to Redis (read via GET /admin/metrics/celery).
+_task_started_at = {}
+
+@before_task_publish.connect
+def _stamp_publish_time(headers=None, **kwargs):
+    if headers is not None:
+        headers["published_at"] = time.time()
+
+@task_prerun.connect
+def _record_task_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _task_started_at[task_id] = now
+    published_at = getattr(task.request, "published_at", None) or (task.request.headers or {}).get("published_at")
+    if published_at:
+        metrics.increment(f"celery:{task.name}", started=1, queue_lag_ms=(now - float(published_at)) * 1000)
+
+@task_postrun.connect
+def _record_task_end(task_id=None, task=None, **kwargs):
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None:
+        metrics.increment(f"celery:{task.name}", runs=1, duration_ms=(time.time() - started_at) * 1000)
+    if metrics.flush_due():
+        try:
+            metrics.flush()
+        except Exception as e:
+            print(f"Could not flush task metrics: {e}")
+
+@task_failure.connect
+def _record_task_failure(sender=None, **kwargs):
+    metrics.increment(f"celery:{sender.name}", failures=1)
+
+def queue_depths() -> dict:
+    depths = {}
+    with celery_app.connection_or_acquire() as conn:
+        for queue in celery_app.conf.task_queues:
+            try:
+                depths[queue.name] = conn.default_channel.queue_declare(queue=queue.name, passive=True).message_count
+            except Exception:
+                depths[queue.name] = None
+    return depths
+
+if __name__ == "__main__":
+    # python -m app.worker <queue>: one worker pool per queue, sized from Settings
+    queue = sys.argv[1] if len(sys.argv) > 1 else "default"
+    celery_app.worker_main([
+        "worker",
+        "--loglevel=info",
+        "-Q", queue,
+        "-n", f"{queue}@%h",
+        "-c", str(settings.CELERY_QUEUE_CONCURRENCY.get(queue, 2)),
+        "--prefetch-multiplier", str(settings.CELERY_QUEUE_PREFETCH.get(queue, 1)),
+    ])
@@ -0,0 +1,250 @@
+"""
+Latency / throughput benchmark for the hot API endpoints.
+
+Runs the app in-process against a throwaway database (SQLite by default,
+or a Postgres database named *_bench via BENCH_DATABASE_URL; DATABASE_URL
+is ignored), seeds a synthetic fleet and measures
+login, vehicle search, booking creation, booking listing and payment.
+
+    python -m benchmarks.bench_endpoints                  # compare with baseline
+    python -m benchmarks.bench_endpoints --save-baseline  # record a new baseline
+
+Exits with status 1 when a scenario's p95 latency or query count regresses
+beyond the configured thresholds.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Settings are read at import time, so the environment must be ready first.
+# DATABASE_URL is always replaced: an app DATABASE_URL exported in the shell
+# must never be the database that seed() drops.
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL") or "sqlite:///./bench.db"
+os.environ.setdefault("PROJECT_NAME", "Car Rental Benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_USER", "postgres")
+os.environ.setdefault("POSTGRES_PASSWORD", "postgres")
+os.environ.setdefault("POSTGRES_DB", "car_rental_bench")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel
+
+from app.core import security
+from app.db import base  # noqa: F401  (registers all tables)
+from app.db.session import engine
+from app.main import app
+from app.models.booking import Booking, BookingStatus
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+LOCATIONS = ["Mumbai", "Delhi", "Bengaluru", "Pune", "Chennai", "Hyderabad", "Kolkata", "Jaipur"]
+MAKES = [("Toyota", "Camry"), ("Honda", "City"), ("Hyundai", "Creta"), ("Maruti", "Swift"), ("Mahindra", "XUV700")]
+PASSWORD = "benchmark-password"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def is_bench_database(url) -> bool:
+    return url.get_backend_name() == "sqlite" or (url.database or "").endswith("_bench")
+
+
+def seed(n_vehicles: int, n_users: int, n_bookings: int) -> None:
+    if not is_bench_database(engine.url):
+        raise SystemExit(
+            f"Refusing to seed {engine.url.render_as_string(hide_password=True)}: all tables are dropped first, "
+            "so BENCH_DATABASE_URL must be SQLite or name a database ending in _bench"
+        )
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    hashed = security.get_password_hash(PASSWORD)
+    today = date.today()
+    with Session(engine) as session:
+        session.add_all(
+            User(email=f"user{i}@bench.example.com", hashed_password=hashed, full_name=f"Bench User {i}")
+            for i in range(n_users)
+        )
+        session.add_all(
+            Vehicle(
+                make=MAKES[i % len(MAKES)][0],
+                model=MAKES[i % len(MAKES)][1],
+                year=2018 + i % 7,
+                license_plate=f"BENCH-{i:06d}",
+                daily_rate=40.0 + (i % 20) * 5,
+                location=LOCATIONS[i % len(LOCATIONS)],
+            )
+            for i in range(n_vehicles)
+        )
+        session.commit()
+
+        # History in the past plus near-term bookings that date searches must exclude
+        for i in range(n_bookings):
+            vehicle_index = i % n_vehicles
+            start = today + timedelta(days=(i // n_vehicles) * 4 - 20)
+            session.add(Booking(
+                user_id=1 + i % n_users,
+                vehicle_id=1 + vehicle_index,
+                pickup_location=LOCATIONS[vehicle_index % len(LOCATIONS)],
+                start_date=start,
+                end_date=start + timedelta(days=3),
+                total_amount=150.0,
+                status=BookingStatus.CONFIRMED if start >= today else BookingStatus.COMPLETED,
+            ))
+        session.commit()
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(name: str, request, iterations: int, counter: QueryCounter, warmup: int = 3) -> dict:
+    for i in range(warmup):
+        request(i)
+
+    latencies, queries = [], []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        counter.count = 0
+        t0 = time.perf_counter()
+        response = request(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+    elapsed = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(iterations / elapsed, 1),
+        "queries_max": max(queries),
+        "queries_mean": round(statistics.fmean(queries), 2),
+    }
+
+
+def run(args) -> dict:
+    seed(args.vehicles, args.users, args.bookings)
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    engine.echo = False
+
+    results = {}
+    today = date.today()
+    created = []
+
+    with TestClient(app) as client:
+        login = lambda i: client.post(
+            "/api/v1/auth/login",
+            data={"username": f"user{i % args.users}@bench.example.com", "password": PASSWORD},
+        )
+        results["login"] = measure("login", login, args.login_iterations, counter, warmup=1)
+
+        token = login(0).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def search(i):
+            start = today + timedelta(days=1 + i % 30)
+            return client.get("/api/v1/vehicles/", params={
+                "location": LOCATIONS[i % len(LOCATIONS)],
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=3)).isoformat(),
+            })
+        results["vehicle_search"] = measure("vehicle_search", search, args.iterations, counter)
+
+        def create_booking(i):
+            vehicle_id = 1 + i % args.vehicles
+            start = today + timedelta(days=400 + (i // args.vehicles) * 4)
+            response = client.post("/api/v1/bookings/", headers=headers, json={
+                "vehicle_id": vehicle_id,
+                "pickup_location": LOCATIONS[(vehicle_id - 1) % len(LOCATIONS)],
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=2)).isoformat(),
+            })
+            if response.status_code < 400:
+                created.append(response.json())
+            return response
+        results["booking_create"] = measure("booking_create", create_booking, args.iterations, counter)
+
+        list_bookings = lambda i: client.get("/api/v1/bookings/", headers=headers, params={"limit": 100})
+        results["booking_list"] = measure("booking_list", list_bookings, args.iterations, counter)
+
+        pay = lambda i: client.post("/api/v1/payments/process", headers=headers, json={
+            "booking_id": created[i]["id"],
+            "amount": created[i]["total_amount"],
+        })
+        results["payment"] = measure("payment", pay, min(args.iterations, len(created) - 3), counter)
+
+    event.remove(engine, "before_cursor_execute", counter)
+    return results
+
+
+def compare(results: dict, baseline: dict, p95_threshold: float, query_threshold: int) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + p95_threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {previous['p95_ms']}ms (+{p95_threshold:.0%})")
+        if current["queries_max"] > previous["queries_max"] + query_threshold:
+            regressions.append(f"{name}: {current['queries_max']} queries/request > baseline {previous['queries_max']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hot API endpoints")
+    parser.add_argument("--vehicles", type=int, default=500)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--login-iterations", type=int, default=20, help="login is bcrypt-bound, keep it small")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--p95-threshold", type=float, default=0.25, help="allowed relative p95 increase")
+    parser.add_argument("--query-threshold", type=int, default=0, help="allowed extra queries per request")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print(f"{'scenario':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'queries':>9}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['throughput_rps']:>9}{r['queries_max']:>9}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline found; run with --save-baseline to record one.")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.p95_threshold, args.query_threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Per-row cost of producing a list-endpoint JSON body.
+
+before: build BookingRead per row, let FastAPI re-validate it against
+        response_model, dump to JSON-able dicts and encode with stdlib json
+after:  plain dicts from a column projection encoded by orjson
+
+    python -m benchmarks.bench_serialization --rows 5000
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.models.booking import BookingStatus
+from app.schemas.booking import BookingRead
+
+
+def make_rows(n: int) -> List[dict]:
+    today = date.today()
+    return [
+        {
+            "id": i,
+            "user_id": i % 97,
+            "vehicle_id": i % 503,
+            "start_date": today + timedelta(days=i % 60),
+            "end_date": today + timedelta(days=i % 60 + 3),
+            "total_amount": 150.0 + i % 40,
+            "pickup_location": "Andheri, Mumbai",
+            "driver_name": "Ravi",
+            "driver_contact": "+919812345678" if i % 2 else None,
+            "status": BookingStatus.CONFIRMED if i % 2 else BookingStatus.PENDING,
+            "created_at": datetime(2026, 1, 1) + timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+
+
+def before(rows: List[dict], adapter: TypeAdapter) -> bytes:
+    models = [BookingRead(**row) for row in rows]
+    validated = adapter.validate_python([m.model_dump() for m in models])
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def after(rows: List[dict]) -> bytes:
+    return orjson.dumps(rows)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare list serialization paths")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(List[BookingRead])
+    assert json.loads(before(rows, adapter)) == json.loads(after(rows))
+
+    slow = timed(lambda: before(rows, adapter), args.repeat)
+    fast = timed(lambda: after(rows), args.repeat)
+    print(f"rows: {args.rows}")
+    print(f"validate + stdlib json: {slow / args.rows * 1e6:8.2f} us/row")
+    print(f"projection + orjson:    {fast / args.rows * 1e6:8.2f} us/row  ({slow / fast:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
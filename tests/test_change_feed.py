@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.change_feed import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_missing_cursor_starts_from_the_beginning():
+    assert decode_cursor(None) == ((0, 0), (0, 0))
+    assert decode_cursor("", xids=False) == ((datetime.min, 0), (datetime.min, 0))
+
+
+def test_transaction_id_cursor_round_trips():
+    cursor = encode_cursor((812345, 17), (812300, 4))
+    assert decode_cursor(cursor) == ((812345, 17), (812300, 4))
+
+
+def test_timestamp_cursor_round_trips():
+    rows, deleted = (datetime(2026, 10, 19, 12, 30, 5, 123456), 9), (datetime(2026, 10, 18), 2)
+    assert decode_cursor(encode_cursor(rows, deleted), xids=False) == (rows, deleted)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor((2 ** 40, 123456789), (2 ** 40, 1))
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+def test_cursor_from_the_other_ordering_is_rejected():
+    # A timestamp cursor is meaningless against transaction ids, and vice versa
+    timestamp_cursor = encode_cursor((datetime(2026, 10, 19), 1), (datetime(2026, 10, 19), 1))
+    with pytest.raises(InvalidCursor):
+        decode_cursor(timestamp_cursor, xids=True)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor((5, 1), (5, 1)), xids=False)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "e30", "WyJ4Il0"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
@@ -0,0 +1,62 @@
+import gzip
+import zlib
+
+import pytest
+
+from app.helpers import compression
+from app.helpers.compression import _StreamCompressor, compress, negotiate
+
+needs_brotli = pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+
+
+def test_negotiate_gzip():
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("deflate, gzip;q=0.5") == "gzip"
+
+
+def test_negotiate_nothing_acceptable():
+    assert negotiate("") is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("gzip;q=oops") is None
+
+
+@needs_brotli
+def test_negotiate_prefers_brotli():
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("*") == "br"
+    assert negotiate("br;q=0, gzip") == "gzip"
+
+
+def test_wildcard_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate("*") == "gzip"
+    assert negotiate("br") is None
+
+
+def test_stream_compressor_gzip_round_trip():
+    chunks = [b'{"id": %d, "make": "Toyota"}' % i for i in range(50)]
+    stream = _StreamCompressor("gzip")
+    body = b"".join(stream.chunk(chunk, final=i == len(chunks) - 1) for i, chunk in enumerate(chunks))
+    assert gzip.decompress(body) == b"".join(chunks)
+
+
+def test_stream_compressor_flushes_each_chunk():
+    # Every chunk must be decodable as soon as it is sent, or streams stall
+    stream = _StreamCompressor("gzip")
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(stream.chunk(b"data: first\n\n", final=False)) == b"data: first\n\n"
+    assert decoder.decompress(stream.chunk(b"data: second\n\n", final=True)) == b"data: second\n\n"
+
+
+@needs_brotli
+def test_stream_compressor_brotli_round_trip():
+    stream = _StreamCompressor("br")
+    body = stream.chunk(b"hello ", final=False) + stream.chunk(b"world", final=True)
+    assert compression.brotli.decompress(body) == b"hello world"
+
+
+def test_compress_one_shot():
+    body = b"x" * 10000
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert gzip.decompress(compress(body, "gzip", best=True)) == body
@@ -0,0 +1,27 @@
+from sqlmodel import select
+
+from app.models.booking_event import BookingEvent
+from app.services import history_service
+
+
+def test_records_transitions_on_sqlite(session):
+    history_service.record(session, 1, None, "pending", "api", actor_id=7)
+    history_service.record(session, 1, "pending", "confirmed", "worker")
+    history_service.record(session, 2, None, "pending", "api")
+    session.commit()
+
+    events = history_service.for_booking(session, 1)
+    assert [(e.from_status, e.to_status, e.source) for e in events] == [
+        (None, "pending", "api"),
+        ("pending", "confirmed", "worker"),
+    ]
+    assert events[0].actor_id == 7
+    assert session.exec(select(BookingEvent.id).order_by(BookingEvent.id)).all() == [1, 2, 3]
+
+
+def test_ids_continue_across_transactions(session):
+    history_service.record(session, 1, None, "pending", "api")
+    session.commit()
+    history_service.record(session, 1, "pending", "cancelled", "api")
+    session.commit()
+    assert [event.id for event in history_service.for_booking(session, 1)] == [1, 2]
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.users import update_kyc_status
+from app.core.config import settings
+from app.models.user import KYCStatus, User
+from app.schemas.user import UserKYCUpdate
+from app.services import kyc_service
+
+
+def add_user(session, name, **fields):
+    user = User(email=f"{name}@example.com", hashed_password="x", **fields)
+    session.add(user)
+    session.commit()
+    return user
+
+
+@pytest.fixture
+def reviewers(session):
+    return [add_user(session, f"reviewer{i}", is_superuser=True) for i in (1, 2)]
+
+
+@pytest.fixture
+def submitted(session):
+    start = datetime.utcnow() - timedelta(hours=1)
+    users = []
+    for i in range(5):
+        user = add_user(session, f"customer{i}")
+        kyc_service.submit(user)
+        user.kyc_submitted_at = start + timedelta(minutes=i)
+        session.add(user)
+        users.append(user)
+    session.commit()
+    return users
+
+
+def claim_ids(session, reviewer, limit):
+    users = kyc_service.claim(session, reviewer.id, limit)
+    session.commit()
+    return [user.id for user in users]
+
+
+def test_claims_are_batched_oldest_first_without_overlap(session, reviewers, submitted):
+    first, second = reviewers
+    assert claim_ids(session, first, 2) == [submitted[0].id, submitted[1].id]
+    assert claim_ids(session, second, 2) == [submitted[2].id, submitted[3].id]
+    assert submitted[0].kyc_claimed_by == first.id
+
+
+def test_reclaiming_renews_the_reviewers_own_claims(session, reviewers, submitted):
+    first, _ = reviewers
+    claim_ids(session, first, 2)
+    # Own open claims come back first (they are the oldest), with a fresh lease
+    assert claim_ids(session, first, 3) == [user.id for user in submitted[:3]]
+
+
+def test_expired_claims_return_to_the_queue(session, reviewers, submitted):
+    first, second = reviewers
+    claim_ids(session, first, 2)
+    lapsed = datetime.utcnow() - timedelta(minutes=settings.KYC_CLAIM_LEASE_MINUTES + 1)
+    submitted[0].kyc_claimed_at = lapsed
+    session.add(submitted[0])
+    session.commit()
+
+    assert claim_ids(session, second, 2) == [submitted[0].id, submitted[2].id]
+    assert submitted[0].kyc_claimed_by == second.id
+
+
+def test_decided_and_unsubmitted_users_are_not_claimed(session, reviewers, submitted):
+    add_user(session, "never-submitted")
+    submitted[0].kyc_status = KYCStatus.VERIFIED
+    session.add(submitted[0])
+    session.commit()
+    assert claim_ids(session, reviewers[0], 10) == [user.id for user in submitted[1:]]
+
+
+def test_decision_from_a_reviewer_without_the_claim_is_rejected(session, reviewers, submitted):
+    first, second = reviewers
+    claim_ids(session, first, 1)
+    with pytest.raises(HTTPException) as exc:
+        update_kyc_status(session=session, user_id=submitted[0].id, kyc_in=UserKYCUpdate(kyc_status=KYCStatus.VERIFIED), current_user=second)
+    assert exc.value.status_code == 409
+    session.refresh(submitted[0])
+    assert submitted[0].kyc_status == KYCStatus.SUBMITTED
+
+
+def test_decision_by_the_claim_holder_releases_the_claim(session, reviewers, submitted):
+    first, _ = reviewers
+    claim_ids(session, first, 1)
+    user = update_kyc_status(session=session, user_id=submitted[0].id, kyc_in=UserKYCUpdate(kyc_status=KYCStatus.VERIFIED), current_user=first)
+    assert user.kyc_status == KYCStatus.VERIFIED
+    assert user.kyc_verified
+    assert user.kyc_claimed_by is None
+    assert user.kyc_decided_at is not None
+
+
+def test_anyone_may_decide_once_a_claim_has_lapsed(session, reviewers, submitted):
+    first, second = reviewers
+    claim_ids(session, first, 1)
+    submitted[0].kyc_claimed_at = datetime.utcnow() - timedelta(minutes=settings.KYC_CLAIM_LEASE_MINUTES + 1)
+    session.add(submitted[0])
+    session.commit()
+    user = update_kyc_status(session=session, user_id=submitted[0].id, kyc_in=UserKYCUpdate(kyc_status=KYCStatus.REJECTED), current_user=second)
+    assert user.kyc_status == KYCStatus.REJECTED
+
+
+def test_queue_stats_count_claims_and_decisions(session, reviewers, submitted):
+    first, _ = reviewers
+    claim_ids(session, first, 2)
+    update_kyc_status(session=session, user_id=submitted[0].id, kyc_in=UserKYCUpdate(kyc_status=KYCStatus.VERIFIED), current_user=first)
+
+    stats = kyc_service.queue_stats(session)
+    assert (stats["depth"], stats["claimed"], stats["unclaimed"]) == (4, 1, 3)
+    assert stats["decisions_last_day"] == 1
+    assert stats["avg_wait_seconds_last_day"] == pytest.approx(3600, abs=60)
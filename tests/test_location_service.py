@@ -0,0 +1,20 @@
+from app.services.location_service import candidate_keys, normalize
+
+
+def test_normalize():
+    assert normalize("  Navi   Mumbai ") == "navi mumbai"
+    assert normalize("St. Louis") == "st louis"
+
+
+def test_candidate_keys_most_specific_first():
+    assert candidate_keys("Andheri East, Mumbai") == ["andheri east, mumbai", "mumbai", "andheri east"]
+
+
+def test_candidate_keys_single_place():
+    assert candidate_keys("Mumbai") == ["mumbai"]
+    assert candidate_keys("  MUMBAI ") == ["mumbai"]
+
+
+def test_candidate_keys_skip_empty_parts_and_duplicates():
+    assert candidate_keys("Bandra,, Mumbai, Mumbai") == ["bandra,, mumbai, mumbai", "mumbai", "bandra"]
+    assert candidate_keys("") == []
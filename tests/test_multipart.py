@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.helpers.multipart import MultipartFileStream
+
+BOUNDARY = "----testboundary7MA4YWxkTrZu0gW"
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 20
+
+
+def body(field="file", content_type="application/pdf", data=PDF, extra_fields=()):
+    parts = [
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in extra_fields
+    ]
+    parts.append(
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{field}"; filename="doc.pdf"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n".encode() + data + b"\r\n"
+    )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(payload: bytes, chunk_size: int):
+    chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+    messages = [{"type": "http.request", "body": c, "more_body": True} for c in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/upload",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def read(payload: bytes, chunk_size: int = 65536, field: str = "file", content_types=None):
+    async def collect():
+        stream = MultipartFileStream(make_request(payload, chunk_size), field, content_types)
+        data = b"".join([chunk async for chunk in stream])
+        return stream, data
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000, 65536])
+def test_file_survives_any_chunk_split(chunk_size):
+    stream, data = read(body(extra_fields=[("note", "hello")]), chunk_size)
+    assert data == PDF
+    assert stream.filename == "doc.pdf"
+    assert stream.content_type == "application/pdf"
+
+
+def test_other_field_name_is_a_400():
+    with pytest.raises(HTTPException) as exc:
+        read(body(field="document"))
+    assert exc.value.status_code == 400
+    assert "Missing file field 'file'" in exc.value.detail
+
+
+def test_undeclared_type_is_a_415_before_any_data():
+    received = []
+
+    async def collect():
+        stream = MultipartFileStream(make_request(body(content_type="text/html"), 16), "file", {"application/pdf"}, "PDF only")
+        async for chunk in stream:
+            received.append(chunk)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(collect())
+    assert exc.value.status_code == 415
+    assert exc.value.detail == "PDF only"
+    assert received == []
+
+
+def test_allowed_type_passes():
+    _, data = read(body(), content_types={"application/pdf", "image/png"})
+    assert data == PDF
+
+
+@pytest.mark.parametrize("missing", [1, 2000, len(PDF) // 2])
+def test_truncated_upload_is_a_400(missing):
+    payload = body()
+    cut = payload.index(PDF) + len(PDF) - missing
+    with pytest.raises(HTTPException) as exc:
+        read(payload[:cut], chunk_size=512)
+    assert exc.value.status_code == 400
+    assert "incomplete" in exc.value.detail
+
+
+def test_body_without_boundary_header_is_a_400():
+    request = make_request(body(), 1024)
+    request.scope["headers"] = [(b"content-type", b"application/octet-stream")]
+    with pytest.raises(HTTPException) as exc:
+        MultipartFileStream(Request(request.scope), "file")
+    assert exc.value.status_code == 400
@@ -0,0 +1,131 @@
+import json
+
+import fakeredis
+import pytest
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.outbox import OutboxEvent
+from app.services import outbox_service
+
+GROUP = "test-group"
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(outbox_service, "redis_client", redis)
+    return redis
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    handlers = {}
+    monkeypatch.setitem(outbox_service.HANDLERS, GROUP, handlers)
+    return handlers
+
+
+def published(redis):
+    return [
+        {key.decode(): value.decode() for key, value in fields.items()}
+        for _, fields in redis.xrange(settings.OUTBOX_STREAM)
+    ]
+
+
+def pending(redis):
+    return redis.xpending_range(settings.OUTBOX_STREAM, GROUP, min="-", max="+", count=100)
+
+
+def test_relay_publishes_events_committed_with_the_state_change(session, redis):
+    outbox_service.record(session, "booking.created", 1, {"status": "pending"})
+    session.commit()
+    outbox_service.record(session, "booking.created", 2, {"status": "pending"})
+    session.rollback()  # the state change failed, so its event must not exist either
+
+    assert outbox_service.relay_batch(session) == 1
+    [event] = published(redis)
+    assert event["type"] == "booking.created"
+    assert event["aggregate_id"] == "1"
+    assert json.loads(event["payload"]) == {"status": "pending"}
+    assert session.exec(select(OutboxEvent)).one().published_at is not None
+
+    assert outbox_service.relay_batch(session) == 0
+    assert len(published(redis)) == 1
+
+
+def test_relay_leaves_events_unpublished_when_redis_fails(session, redis, monkeypatch):
+    outbox_service.record(session, "booking.created", 1, {})
+    session.commit()
+
+    def broken_pipeline(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis, "pipeline", broken_pipeline)
+    with pytest.raises(ConnectionError):
+        outbox_service.relay_batch(session)
+    session.rollback()
+    assert session.exec(select(OutboxEvent)).one().published_at is None
+
+
+def relay(session, *events):
+    for event_type, aggregate_id in events:
+        outbox_service.record(session, event_type, aggregate_id, {"n": aggregate_id})
+    session.commit()
+    outbox_service.relay_batch(session)
+
+
+def test_consume_dispatches_by_type_and_acknowledges(session, redis, handlers):
+    seen = []
+    handlers["booking.created"] = seen.append
+    relay(session, ("booking.created", 1), ("booking.cancelled", 2))
+
+    assert outbox_service.consume(GROUP, "worker-1") == (2, 0)
+    assert [event["payload"] for event in seen] == [{"n": 1}]
+    assert pending(redis) == []
+
+
+def test_stale_pending_entry_is_redelivered_to_another_consumer(session, redis, handlers):
+    def crash(event):
+        raise RuntimeError("worker died")
+
+    handlers["booking.created"] = crash
+    relay(session, ("booking.created", 1))
+    assert outbox_service.consume(GROUP, "worker-1") == (0, 1)
+    [entry] = pending(redis)
+    assert entry["consumer"] == b"worker-1"
+
+    # Not idle long enough yet: left with the first consumer
+    seen = []
+    handlers["booking.created"] = seen.append
+    assert outbox_service.consume(GROUP, "worker-2", min_idle_ms=60000) == (0, 0)
+    assert seen == []
+
+    assert outbox_service.consume(GROUP, "worker-2", min_idle_ms=0) == (1, 0)
+    assert [event["aggregate_id"] for event in seen] == ["1"]
+    assert pending(redis) == []
+
+
+def test_entry_is_dead_lettered_after_the_delivery_limit(session, redis, handlers, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_MAX_DELIVERIES", 3)
+    attempts = []
+
+    def poison(event):
+        attempts.append(event["id"])
+        raise ValueError("bad payload")
+
+    handlers["booking.created"] = poison
+    relay(session, ("booking.created", 1))
+
+    for _ in range(3):
+        outbox_service.consume(GROUP, "worker-1", min_idle_ms=0)
+    assert len(attempts) == 3
+    assert redis.xlen(settings.OUTBOX_DEAD_LETTER_STREAM) == 0
+
+    # The fourth claim would be delivery number four: dead-lettered, not handled
+    assert outbox_service.consume(GROUP, "worker-1", min_idle_ms=0) == (0, 1)
+    assert len(attempts) == 3
+    assert pending(redis) == []
+    [(_, dead)] = redis.xrange(settings.OUTBOX_DEAD_LETTER_STREAM)
+    assert dead[b"group"] == GROUP.encode()
+    assert dead[b"aggregate_id"] == b"1"
+    assert int(dead[b"times_delivered"]) == 4
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.pricing_service import RateTable, long_rental_multiplier
+
+
+def make_table():
+    # 10 days starting on a Monday: weekdays 1.0, the weekend 1.5
+    multipliers = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.5, 1.5, 1.0, 1.0, 1.0])
+    return RateTable(date(2026, 1, 5), multipliers)
+
+
+def test_units_sums_the_rented_days():
+    table = make_table()
+    assert table.units(date(2026, 1, 5), date(2026, 1, 8)) == 3.0
+    assert table.units(date(2026, 1, 9), date(2026, 1, 12)) == 4.0
+
+
+def test_units_matches_a_direct_sum_for_every_range():
+    table = make_table()
+    multipliers = np.diff(table.cumulative)
+    for s in range(table.days):
+        for e in range(s, table.days + 1):
+            start, end = table.origin + timedelta(days=s), table.origin + timedelta(days=e)
+            assert table.units(start, end) == float(multipliers[s:e].sum())
+
+
+def test_empty_range_costs_nothing():
+    table = make_table()
+    assert table.units(date(2026, 1, 7), date(2026, 1, 7)) == 0.0
+
+
+def test_covers():
+    table = make_table()
+    assert table.covers(date(2026, 1, 5), date(2026, 1, 15))
+    assert not table.covers(date(2026, 1, 4), date(2026, 1, 10))
+    assert not table.covers(date(2026, 1, 5), date(2026, 1, 16))
+
+
+def test_long_rental_multiplier_defaults_to_full_price():
+    assert long_rental_multiplier(1) == 1.0
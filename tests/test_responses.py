@@ -0,0 +1,45 @@
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.helpers.responses import compact, requested_fields
+
+
+class Item(BaseModel):
+    id: int
+    make: str
+    daily_rate: float
+    image_url: Optional[str] = None
+
+
+def test_all_fields_when_absent():
+    assert requested_fields(Item, None) == ["id", "make", "daily_rate", "image_url"]
+
+
+def test_fields_in_the_order_given():
+    assert requested_fields(Item, "daily_rate,id") == ["daily_rate", "id"]
+
+
+def test_fields_are_trimmed_and_deduplicated():
+    assert requested_fields(Item, " id , make,id,") == ["id", "make"]
+
+
+def test_unknown_field_is_a_400():
+    with pytest.raises(HTTPException) as exc:
+        requested_fields(Item, "id,colour")
+    assert exc.value.status_code == 400
+    assert "colour" in exc.value.detail
+
+
+@pytest.mark.parametrize("fields", ["", " , "])
+def test_empty_selection_is_a_400(fields):
+    with pytest.raises(HTTPException) as exc:
+        requested_fields(Item, fields)
+    assert exc.value.status_code == 400
+
+
+def test_compact_rows_follow_field_order():
+    items = [{"id": 1, "make": "Kia"}, {"id": 2}]
+    assert compact(items, ["make", "id"]) == {"fields": ["make", "id"], "rows": [["Kia", 1], [None, 2]]}
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core import revocation
+from app.core.revocation import BloomFilter, RevocationList
+
+
+def test_members_are_always_found():
+    bloom = BloomFilter(1000, 0.01)
+    members = [f"jti-{i}" for i in range(1000)]
+    for member in members:
+        bloom.add(member)
+    assert all(member in bloom for member in members)
+
+
+def test_false_positive_rate_stays_near_target():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(10, 0.001)
+    assert "anything" not in bloom
+
+
+def test_sizing_follows_capacity_and_error_rate():
+    small, large = BloomFilter(100, 0.01), BloomFilter(10000, 0.01)
+    assert large.size > small.size
+    assert len(large.bits) == (large.size + 7) // 8
+    assert BloomFilter(100, 0.0001).hashes > small.hashes
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def zremrangebyscore(self, *args):
+        pass
+
+    def zrangebyscore(self, *args):
+        pass
+
+    def execute(self):
+        if self.redis.during_reload:
+            self.redis.during_reload()
+        return [0, [jti.encode() for jti in self.redis.revoked]]
+
+
+class FakeRedis:
+    def __init__(self, revoked=(), down=False):
+        self.revoked = {jti: time.time() + 3600 for jti in revoked}
+        self.down = down
+        self.zscore_calls = 0
+        self.during_reload = None
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def zscore(self, key, jti):
+        self.zscore_calls += 1
+        if self.down:
+            raise RedisConnectionError("unreachable")
+        return self.revoked.get(jti)
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    def make(redis):
+        monkeypatch.setattr(revocation, "redis_client", redis)
+        revocations = RevocationList()
+        # No listener thread: tests drive reload() themselves
+        monkeypatch.setattr(revocations, "ensure_started", lambda: None)
+        return revocations
+
+    return make
+
+
+def test_loaded_filter_answers_without_redis(revocations):
+    redis = FakeRedis(revoked=["bad"])
+    revocations = revocations(redis)
+    revocations.reload()
+    assert not revocations.is_revoked("good")
+    assert redis.zscore_calls == 0
+    assert revocations.is_revoked("bad")
+
+
+def test_redis_outage_is_not_retried_on_every_request(revocations):
+    redis = FakeRedis(down=True)
+    revocations = revocations(redis)
+    for _ in range(5):
+        assert not revocations.is_revoked("token")
+    assert redis.zscore_calls == 1
+
+
+def test_stale_filter_still_rejects_known_revocations_during_outage(revocations):
+    redis = FakeRedis(revoked=["bad"])
+    revocations = revocations(redis)
+    revocations.reload()
+    revocations.ready = False  # subscription dropped
+    redis.down = True
+    assert revocations.is_revoked("bad")
+    assert not revocations.is_revoked("good")
+
+
+def test_redis_is_asked_again_after_the_backoff(revocations, monkeypatch):
+    redis = FakeRedis(down=True)
+    revocations = revocations(redis)
+    revocations.is_revoked("token")
+    monkeypatch.setattr(revocations, "_redis_down_until", 0.0)
+    redis.down = False
+    redis.revoked["token"] = time.time() + 60
+    assert revocations.is_revoked("token")
+    assert redis.zscore_calls == 2
+
+
+def test_reload_does_not_block_revocations_and_keeps_them(revocations):
+    redis = FakeRedis(revoked=["old"])
+    revocations = revocations(redis)
+
+    def revoke_meanwhile():
+        # Runs while Redis is being read; must not wait for the reload
+        thread = threading.Thread(target=revocations.add, args=("new",))
+        thread.start()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+    redis.during_reload = revoke_meanwhile
+    revocations.reload()
+    assert "old" in revocations.bloom
+    assert "new" in revocations.bloom
@@ -0,0 +1,127 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models.booking import Booking, BookingStatus
+from app.models.rollup import DailyRollup, RollupDirtyDay
+from app.models.vehicle import Vehicle
+from app.services import archive_service, rollup_service
+
+DAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def vehicle(session):
+    vehicle = Vehicle(make="Toyota", model="Camry", year=2022, license_plate="MH-01", daily_rate=50.0, location="Mumbai")
+    session.add(vehicle)
+    session.commit()
+    return vehicle
+
+
+def add_booking(session, vehicle, created_on, start, days, status, total):
+    booking = Booking(
+        user_id=1,
+        vehicle_id=vehicle.id,
+        pickup_location="Mumbai",
+        start_date=start,
+        end_date=start + timedelta(days=days),
+        total_amount=total,
+        status=status,
+        created_at=datetime.combine(created_on, datetime.min.time()) + timedelta(hours=10),
+    )
+    session.add(booking)
+    return booking
+
+
+def rollups(session):
+    return {row.day: row for row in session.exec(select(DailyRollup)).all()}
+
+
+def test_revenue_and_booked_days_belong_to_the_creation_day(session, vehicle):
+    # Created on DAY, rented a month later: everything lands on DAY
+    add_booking(session, vehicle, DAY, DAY + timedelta(days=30), 3, BookingStatus.CONFIRMED, 150.0)
+    add_booking(session, vehicle, DAY, DAY + timedelta(days=40), 2, BookingStatus.COMPLETED, 100.0)
+    add_booking(session, vehicle, DAY, DAY + timedelta(days=50), 5, BookingStatus.CANCELLED, 250.0)
+    add_booking(session, vehicle, DAY, DAY + timedelta(days=60), 4, BookingStatus.PENDING, 200.0)
+    session.commit()
+
+    rental_days = [DAY + timedelta(days=n) for n in range(30, 65)]
+    assert rollup_service.rebuild_days(session, [DAY, *rental_days]) == 1
+    session.commit()
+
+    [row] = rollups(session).values()
+    assert row.day == DAY
+    assert row.location == "Mumbai"
+    assert (row.bookings_created, row.bookings_confirmed, row.cancellations) == (4, 2, 1)
+    # Only confirmed and completed bookings count towards days and revenue
+    assert row.booked_days == 5
+    assert row.revenue == 250.0
+
+
+def test_rebuild_includes_archived_bookings(session, vehicle):
+    add_booking(session, vehicle, DAY, DAY, 2, BookingStatus.COMPLETED, 100.0)
+    add_booking(session, vehicle, DAY, DAY + timedelta(days=90), 3, BookingStatus.CONFIRMED, 150.0)
+    session.commit()
+    assert archive_service.archive_batch(session, cutoff=DAY + timedelta(days=10)) == 1
+    assert len(session.exec(select(Booking)).all()) == 1
+
+    rollup_service.rebuild_days(session, [DAY])
+    session.commit()
+    row = rollups(session)[DAY]
+    assert (row.bookings_created, row.booked_days, row.revenue) == (2, 5, 250.0)
+
+
+def test_rebuild_replaces_stale_rows_and_clears_empty_days(session, vehicle):
+    booking = add_booking(session, vehicle, DAY, DAY, 2, BookingStatus.CONFIRMED, 100.0)
+    session.commit()
+    rollup_service.rebuild_days(session, [DAY])
+    session.commit()
+
+    session.delete(booking)
+    session.commit()
+    rollup_service.rebuild_days(session, [DAY])
+    session.commit()
+    assert rollups(session) == {}
+
+
+def test_refresh_rebuilds_dirty_days_and_clears_their_marks(session, vehicle):
+    other = DAY + timedelta(days=1)
+    add_booking(session, vehicle, DAY, DAY, 1, BookingStatus.CONFIRMED, 50.0)
+    add_booking(session, vehicle, other, other, 1, BookingStatus.CONFIRMED, 60.0)
+    for day in (DAY, other, DAY):
+        rollup_service.mark_dirty(session, day)
+    session.commit()
+
+    assert rollup_service.refresh_dirty_days(session) == [DAY, other]
+    assert set(rollups(session)) == {DAY, other}
+    assert session.exec(select(RollupDirtyDay)).all() == []
+    assert rollup_service.refresh_dirty_days(session) == []
+
+
+def test_refresh_leaves_marks_beyond_the_batch(session, vehicle):
+    for offset in range(3):
+        rollup_service.mark_dirty(session, DAY + timedelta(days=offset))
+    session.commit()
+
+    assert rollup_service.refresh_dirty_days(session, batch_size=2) == [DAY, DAY + timedelta(days=1)]
+    assert [mark.day for mark in session.exec(select(RollupDirtyDay)).all()] == [DAY + timedelta(days=2)]
+
+
+def test_refresh_keeps_a_mark_committed_with_a_lower_id_after_the_read(session, vehicle, monkeypatch):
+    late = DAY + timedelta(days=5)
+    session.add(RollupDirtyDay(id=10, day=DAY))
+    session.add(RollupDirtyDay(id=11, day=DAY))
+    session.commit()
+
+    rebuild_days = rollup_service.rebuild_days
+
+    def rebuild_while_another_writer_commits(session, days):
+        # A transaction that drew id 5 before the read but committed after it
+        session.add(RollupDirtyDay(id=5, day=late))
+        session.flush()
+        return rebuild_days(session, days)
+
+    monkeypatch.setattr(rollup_service, "rebuild_days", rebuild_while_another_writer_commits)
+    assert rollup_service.refresh_dirty_days(session) == [DAY]
+    assert [(mark.id, mark.day) for mark in session.exec(select(RollupDirtyDay)).all()] == [(5, late)]